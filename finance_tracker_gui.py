@@ -1,32 +1,49 @@
 import os
 import sys
 import csv
+import re
 import json
+import html
+import math
+import time
 import sqlite3
+import hashlib
+import importlib.util
+import difflib
+import itertools
 import logging
+import threading
 from logging.handlers import RotatingFileHandler
-from collections import defaultdict
-from datetime import datetime, timedelta
-from PyQt6.QtGui import (QPalette, QIcon)
-from PyQt6.QtWidgets import (
+from collections import defaultdict, OrderedDict
+from contextlib import contextmanager
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# Taken between the stdlib and PyQt6 imports so STARTUP_TIMINGS can report the latter
+_STARTUP_STARTED = time.perf_counter()
+from PyQt6.QtGui import (QPalette, QIcon, QPainter, QColor, QTextDocument, QShortcut, QKeySequence)  # noqa: E402
+from PyQt6.QtWidgets import (  # noqa: E402
     QApplication, QMainWindow, QWidget, QPushButton,
     QVBoxLayout, QHBoxLayout, QStackedWidget,
     QCheckBox, QLabel, QLineEdit, QComboBox, QDateEdit, 
     QListWidget, QInputDialog, QDialog, QGroupBox,
-    QFrame, QTableWidget, QTableWidgetItem, QMessageBox, QFormLayout, 
-    QDialogButtonBox, QHeaderView, QRadioButton, QFileDialog, QButtonGroup
+    QFrame, QMessageBox, QFormLayout, 
+    QDialogButtonBox, QHeaderView, QRadioButton, QFileDialog, QButtonGroup, QProgressBar,
+    QTableView, QStyledItemDelegate, QStyle, QToolTip
 )
-from PyQt6.QtCore import (
+from PyQt6.QtCore import (  # noqa: E402
     Qt, QPropertyAnimation, QEasingCurve, QTimer,
-    pyqtSignal, pyqtProperty, QSettings, QRect, QDate
+    pyqtSignal, pyqtProperty, QSettings, QRect, QDate,
+    QAbstractTableModel, QModelIndex, QEvent, QObject,
+    QRunnable, QThreadPool
 )
-try:
-    import matplotlib.dates as mdates
-    from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-    from matplotlib.figure import Figure
-    MATPLOTLIB_AVAILABLE = True
-except Exception:
-    MATPLOTLIB_AVAILABLE = False
+# (phase, seconds) - reported at DEBUG once the first event-loop tick has run
+STARTUP_TIMINGS = [("import PyQt6", time.perf_counter() - _STARTUP_STARTED)]
+
+# Graphing and Excel support are imported on first use; only probe for them here
+MATPLOTLIB_AVAILABLE = all(importlib.util.find_spec(m) is not None for m in ("numpy", "matplotlib"))
+OPENPYXL_AVAILABLE = importlib.util.find_spec("openpyxl") is not None
+np = mdates = FigureCanvas = Figure = openpyxl = None
+_lazy_import_lock = threading.Lock()
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -47,13 +64,55 @@ file_handler = RotatingFileHandler(
 file_handler.setFormatter(formatter)
 logger.addHandler(file_handler)
 
-try:
-    import openpyxl  
-    OPENPYXL_AVAILABLE = True
-except ImportError:
-    OPENPYXL_AVAILABLE = False
+if not OPENPYXL_AVAILABLE:
     logger.warning("openpyxl not found. Install with `pip install openpyxl` to enable Excel export.")
 
+@contextmanager
+def startup_phase(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STARTUP_TIMINGS.append((name, elapsed))
+        logger.debug(f"{name}: {elapsed * 1000:.1f} ms")
+
+def log_startup_report():
+    total = time.perf_counter() - _STARTUP_STARTED
+    lines = [f"{'phase':<40} | {'ms':>9}"]
+    lines += [f"{name:<40} | {seconds * 1000:>9.1f}" for name, seconds in STARTUP_TIMINGS]
+    lines.append(f"{'total to first event-loop tick':<40} | {total * 1000:>9.1f}")
+    logger.debug("Startup timing:\n" + "\n".join(lines))
+
+def load_matplotlib() -> bool:
+    """Import numpy/matplotlib on first use (any thread); False if unavailable."""
+    global np, mdates, FigureCanvas, Figure, MATPLOTLIB_AVAILABLE
+    if not MATPLOTLIB_AVAILABLE:
+        return False
+    with _lazy_import_lock:
+        if Figure is None:
+            try:
+                with startup_phase("import matplotlib (lazy)"):
+                    import numpy
+                    import matplotlib.dates
+                    from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+                    from matplotlib.figure import Figure as _Figure
+            except Exception as e:
+                MATPLOTLIB_AVAILABLE = False
+                logger.warning(f"matplotlib could not be imported, graphs disabled: {e}")
+                return False
+            np, mdates, FigureCanvas, Figure = numpy, matplotlib.dates, FigureCanvasQTAgg, _Figure
+    return True
+
+def load_openpyxl():
+    """Import openpyxl on the first XLSX export/import; None if unavailable."""
+    global openpyxl
+    if OPENPYXL_AVAILABLE and openpyxl is None:
+        with _lazy_import_lock, startup_phase("import openpyxl (lazy)"):
+            import openpyxl as _openpyxl
+            openpyxl = _openpyxl
+    return openpyxl
+
 
 # ---------------------------
 #           Config
@@ -69,6 +128,36 @@ TOGGLE_WIDTH = 60
 TOGGLE_HEIGHT = 28
 TOGGLE_MARGIN = 2
 TOGGLE_PADDING = 6
+DB_PATH = "transactions.db"
+DB_CACHED_STATEMENTS = 256
+AMOUNT_PRECISION = 2    # decimal places of the minor currency unit; the database records its own
+QUERY_THREADS = 2
+SEARCH_DEBOUNCE_MS = 250    # Transaction Log filters apply this long after the last edit
+FILTER_CACHE_SIZE = 16      # recent Transaction Log filters whose first page and count are kept
+UNDO_DELETE_SECONDS = 5     # a deleted transaction can be restored this long before it is purged
+BULK_SELECT_LIMIT = 50_000  # rows Select All loads into the Transaction Log for a bulk action
+EXPORT_BATCH_SIZE = 1000
+IMPORT_BATCH_SIZE = 5000
+GRAPH_MAX_POINTS = 2000
+GRAPH_THEMES = {
+    "dark": {"background": "#2c2c2c", "text": "#ffffff", "line": "#88c0d0", "grid": "#4a4a4a"},
+    "light": {"background": "#f0f0f0", "text": "#000000", "line": "#1f77b4", "grid": "#cccccc"},
+}
+DB_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-20000",     # ~20 MB page cache
+    "PRAGMA mmap_size=268435456",   # 256 MB
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+# Applied for the duration of a bulk import, then reset to DB_PRAGMAS. WAL keeps
+# the file consistent with synchronous=OFF; only the last commit is at risk.
+BULK_LOAD_PRAGMAS = (
+    "PRAGMA synchronous=OFF",
+    "PRAGMA cache_size=-200000",    # ~200 MB page cache
+    "PRAGMA temp_store=FILE",       # staging tables spill to disk instead of RAM
+)
 DARK_MODE = """
             .settings-label {
                 font-size: 16px;
@@ -172,7 +261,7 @@ DARK_MODE = """
                 padding: 4px;
                 color: white;
             }
-            QTableWidget {
+            QTableView {
                 gridline-color: #555;
                 background-color: #2c2c2c;
                 alternate-background-color: #3a3a3a;
@@ -300,7 +389,7 @@ LIGHT_MODE = """
                 padding: 4px;
                 color: black;
             }
-            QTableWidget {
+            QTableView {
                 gridline-color: #ccc;
                 background-color: white;
                 alternate-background-color: #f5f5f5;
@@ -327,21 +416,1306 @@ LIGHT_MODE = """
             }
         """
 
-def create_db():
-    conn = sqlite3.connect("transactions.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS transactions (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        type TEXT NOT NULL,
-        amount REAL NOT NULL,
-        category TEXT,
-        date DATETIME NOT NULL,
-        note TEXT
+def canonical_label(value):
+    """Form in which transaction types and categories are stored and compared."""
+    if value is None:
+        return None
+    return str(value).strip().lower()
+
+def to_minor_units(value, precision: int) -> int:
+    """Parse a decimal amount (text or number) into integer minor units, rounding half up."""
+    text = str(value).strip()
+    # Fast path for plain "123.45" text that needs no rounding (the bulk of an import)
+    whole, _, fraction = text.partition(".")
+    if len(fraction) <= precision and whole.lstrip("-").isdecimal() and text.isascii() \
+            and (fraction.isdecimal() or not fraction):
+        return int(whole + fraction.ljust(precision, "0"))
+    try:
+        amount = Decimal(text or 0).scaleb(precision)
+        return int(amount.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"Invalid amount: {value!r}") from None
+
+def format_amount(units: int, precision: int) -> str:
+    """Exact decimal text for an amount stored in minor units."""
+    whole, fraction = divmod(abs(int(units)), 10 ** precision)
+    sign = "-" if units < 0 else ""
+    return f"{sign}{whole}.{fraction:0{precision}d}" if precision else f"{sign}{whole}"
+
+def content_hash(date, type_, category, amount, note) -> bytes:
+    """Stable identity of a transaction's contents: BLAKE2b over its canonical fields.
+
+    `amount` is in minor units. A NULL category or note hashes like an empty one,
+    as exports round-trip them that way."""
+    canonical = "\x1f".join((
+        str(date), canonical_label(type_) or "", canonical_label(category) or "",
+        str(int(amount)), note or "",
+    ))
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+class Database:
+    """Owns one long-lived SQLite connection per thread; the GUI thread's is shared by every page and dialog."""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # Keyed by thread ident rather than threading.local: Qt pool threads get a
+        # fresh Python thread state per task, which would drop thread-local values.
+        self._connections = {}
+        self._tx_depths = defaultdict(int)
+        self.amount_precision = AMOUNT_PRECISION  # replaced by the stored value in create_db()
+        self.connections_opened = 0
+        self.statements_executed = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        ident = threading.get_ident()
+        conn = self._connections.get(ident)
+        if conn is None:
+            conn = self._open()
+            with self._lock:
+                self._connections[ident] = conn
+        return conn
+
+    @property
+    def _tx_depth(self) -> int:
+        return self._tx_depths[threading.get_ident()]
+
+    @_tx_depth.setter
+    def _tx_depth(self, value: int):
+        self._tx_depths[threading.get_ident()] = value
+
+    def _open(self) -> sqlite3.Connection:
+        # Worker connections are closed from the GUI thread on shutdown
+        conn = sqlite3.connect(self.path, cached_statements=DB_CACHED_STATEMENTS, check_same_thread=False)
+        for pragma in DB_PRAGMAS:
+            conn.execute(pragma)
+        conn.create_function("canonical_label", 1, canonical_label, deterministic=True)
+        conn.create_function("content_hash", 5, content_hash, deterministic=True)
+        with self._lock:
+            self.connections_opened += 1
+        logger.debug(f"Opened SQLite connection to {self.path} (#{self.connections_opened}, {threading.current_thread().name})")
+        return conn
+
+    def execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._lock:
+            self.statements_executed += 1
+        return self.conn.execute(sql, params)
+
+    def executemany(self, sql: str, seq_of_params) -> sqlite3.Cursor:
+        with self._lock:
+            self.statements_executed += 1
+        return self.conn.executemany(sql, seq_of_params)
+
+    def fetchone(self, sql: str, params=()):
+        return self.execute(sql, params).fetchone()
+
+    def fetchall(self, sql: str, params=()):
+        return self.execute(sql, params).fetchall()
+
+    def commit(self):
+        self.conn.commit()
+
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        # Nested blocks join the outermost transaction; DDL is included too.
+        # `immediate` takes the write lock up front (read-then-write from a worker).
+        conn = self.conn
+        if self._tx_depth:
+            self._tx_depth += 1
+            try:
+                yield self
+            finally:
+                self._tx_depth -= 1
+            return
+        if not conn.in_transaction:
+            self.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        self._tx_depth = 1
+        try:
+            yield self
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._tx_depth = 0
+
+    @contextmanager
+    def bulk_load(self):
+        """Relax durability and grow the page cache on this thread's connection for a bulk write."""
+        for pragma in BULK_LOAD_PRAGMAS:
+            self.execute(pragma)
+        try:
+            yield self
+        finally:
+            relaxed = {pragma.split("=")[0] for pragma in BULK_LOAD_PRAGMAS}
+            for pragma in DB_PRAGMAS:
+                if pragma.split("=")[0] in relaxed:
+                    self.execute(pragma)
+
+    def stats(self) -> dict:
+        return {
+            "connections_opened": self.connections_opened,
+            "statements_executed": self.statements_executed,
+        }
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = list(self._connections.values()), {}
+        for conn in connections:
+            conn.close()
+        if connections:
+            logger.info(f"Closed {len(connections)} SQLite connection(s) to {self.path} ({self.stats()})")
+
+class _QueryTask(QRunnable):
+    def __init__(self, executor, key, generation, fn, args, with_job=False):
+        super().__init__()
+        self.executor = executor
+        self.key = key
+        self.generation = generation
+        self.fn = fn
+        self.args = args
+        self.with_job = with_job
+
+    # Long-running jobs receive the task itself to poll for cancellation and report progress
+    @property
+    def cancelled(self) -> bool:
+        return self.executor._generations[self.key] != self.generation
+
+    def progress(self, done: int, total: int = 0):
+        self.executor._progress.emit(self.key, self.generation, done, total)
+
+    def run(self):
+        executor = self.executor
+        if not executor._start(self.key, self.generation):
+            return
+        result, error = None, None
+        args = (executor.db, self) + self.args if self.with_job else (executor.db,) + self.args
+        try:
+            result = self.fn(*args)
+        except Exception as e:
+            error = e
+        finally:
+            executor._finish(self.key, self.generation)
+        executor._finished.emit(self.key, self.generation, result, error)
+
+class QueryExecutor(QObject):
+    """Runs read queries on a worker pool, one SQLite connection per worker thread.
+
+    Requests are keyed; submitting a new request for a key cancels the previous
+    one (interrupting its statement if it is already running) and only the
+    newest result is delivered, on the GUI thread."""
+
+    loading_changed = pyqtSignal(str, bool)
+    _finished = pyqtSignal(str, int, object, object)
+    _progress = pyqtSignal(str, int, int, int)
+
+    def __init__(self, db: Database, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(QUERY_THREADS)
+        self.pool.setExpiryTimeout(-1)  # keep worker threads, and their connections, alive
+        self._lock = threading.Lock()
+        self._generations = defaultdict(int)
+        self._callbacks = {}   # key -> (generation, on_result, on_error, on_progress)
+        self._running = {}     # key -> (generation, connection)
+        self._finished.connect(self._deliver)
+        self._progress.connect(self._deliver_progress)
+        self.submitted = 0
+        self.cancelled = 0
+
+    def submit(self, key: str, fn, *args, on_result, on_error=None):
+        self._submit(key, fn, args, on_result, on_error)
+
+    def submit_job(self, key: str, fn, *args, on_result, on_error=None, on_progress=None):
+        """Like submit(), but fn(db, job, *args) gets a job with `cancelled` and `progress(done, total)`."""
+        self._submit(key, fn, args, on_result, on_error, on_progress, with_job=True)
+
+    def _submit(self, key, fn, args, on_result, on_error, on_progress=None, with_job=False):
+        self.cancel(key)
+        with self._lock:
+            self._generations[key] += 1
+            generation = self._generations[key]
+        self._callbacks[key] = (generation, on_result, on_error, on_progress)
+        self.submitted += 1
+        self.loading_changed.emit(key, True)
+        self.pool.start(_QueryTask(self, key, generation, fn, args, with_job))
+
+    def cancel(self, key: str):
+        if self._callbacks.pop(key, None) is None:
+            return
+        with self._lock:
+            self._generations[key] += 1
+            running = self._running.get(key)
+            if running is not None:
+                running[1].interrupt()
+        self.cancelled += 1
+        self.loading_changed.emit(key, False)
+
+    def is_loading(self, key: str) -> bool:
+        return key in self._callbacks
+
+    def shutdown(self):
+        for key in list(self._callbacks):
+            self.cancel(key)
+        self.pool.waitForDone()
+        logger.debug(f"Query executor stopped (submitted={self.submitted}, cancelled={self.cancelled})")
+
+    def _start(self, key, generation) -> bool:
+        conn = self.db.conn
+        with self._lock:
+            if self._generations[key] != generation:
+                return False
+            self._running[key] = (generation, conn)
+            return True
+
+    def _finish(self, key, generation):
+        with self._lock:
+            if self._running.get(key, (None,))[0] == generation:
+                del self._running[key]
+
+    def _deliver(self, key, generation, result, error):
+        callback = self._callbacks.get(key)
+        if callback is None or callback[0] != generation:
+            return  # superseded while in flight
+        del self._callbacks[key]
+        self.loading_changed.emit(key, False)
+        _, on_result, on_error, _ = callback
+        if error is not None:
+            if on_error is not None:
+                on_error(error)
+            else:
+                logger.error(f"Background query '{key}' failed: {error}")
+            return
+        on_result(result)
+
+    def _deliver_progress(self, key, generation, done, total):
+        callback = self._callbacks.get(key)
+        if callback is not None and callback[0] == generation and callback[3] is not None:
+            callback[3](done, total)
+
+def iter_rows(db: Database, sql: str, params=(), batch_size: int = 1000):
+    """Yield a query's rows while holding at most one fetchmany() batch in memory."""
+    cursor = db.execute(sql, params)
+    while batch := cursor.fetchmany(batch_size):
+        yield from batch
+
+# ---------------------------
+#         Migrations
+# ---------------------------
+def _rebuild_transactions_table(db: Database, create_sql: str, copy_sql: str):
+    # SQLite cannot add constraints in place: copy into a new table, swap it in
+    # and restore the indexes/triggers and AUTOINCREMENT sequence of the old one.
+    dependents = [r[0] for r in db.fetchall(
+        "SELECT sql FROM sqlite_master WHERE type IN ('index', 'trigger') "
+        "AND tbl_name = 'transactions' AND sql IS NOT NULL"
+    )]
+    seq = db.fetchone("SELECT seq FROM sqlite_sequence WHERE name = 'transactions'")
+    db.execute("DROP TABLE IF EXISTS transactions_new")
+    db.execute(create_sql.replace("CREATE TABLE transactions", "CREATE TABLE transactions_new", 1))
+    db.execute(copy_sql)
+    db.execute("DROP TABLE transactions")
+    db.execute("ALTER TABLE transactions_new RENAME TO transactions")
+    for sql in dependents:
+        db.execute(sql)
+    if seq:
+        db.execute("UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = 'transactions'", (seq[0],))
+
+def _migrate_canonical_labels(db: Database):
+    _rebuild_transactions_table(db, """
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL CHECK (type = lower(trim(type))),
+            amount REAL NOT NULL,
+            category TEXT CHECK (category = lower(trim(category))),
+            date DATETIME NOT NULL,
+            note TEXT
+        )
+    """, """
+        INSERT INTO transactions_new (id, type, amount, category, date, note)
+        SELECT id, canonical_label(type), amount, canonical_label(category), date, note
+        FROM transactions
+    """)
+
+def _migrate_integer_amounts(db: Database):
+    scale = 10 ** AMOUNT_PRECISION
+    _rebuild_transactions_table(db, """
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL CHECK (type = lower(trim(type))),
+            amount INTEGER NOT NULL CHECK (typeof(amount) = 'integer'),
+            category TEXT CHECK (category = lower(trim(category))),
+            date DATETIME NOT NULL,
+            note TEXT,
+            content_hash BLOB
+        )
+    """, f"""
+        INSERT INTO transactions_new (id, type, amount, category, date, note, content_hash)
+        SELECT id, type, units, category, date, note, content_hash(date, type, category, units, note)
+        FROM (SELECT *, CAST(ROUND(amount * {scale}) AS INTEGER) AS units FROM transactions)
+    """)
+
+def stored_amount_precision(db: Database) -> int:
+    """Decimal places amounts are stored at; writers read it inside their write transaction."""
+    return int(db.fetchone("SELECT value FROM db_settings WHERE name = 'amount_precision'")[0])
+
+def set_amount_precision(db: Database, precision: int) -> int:
+    """Rescale every stored amount to `precision` decimal places; reducing it rounds half away from zero.
+
+    Runs on a worker, so it leaves db.amount_precision for the caller to update on
+    the GUI thread; returns `precision`."""
+    with triggers_suspended(db):
+        old = stored_amount_precision(db)
+        if precision == old:
+            return precision
+        if precision > old:
+            units = f"amount * {10 ** (precision - old)}"
+        else:
+            units = f"CAST(ROUND(amount / {10 ** (old - precision)}.0) AS INTEGER)"
+        db.execute(f"""
+            UPDATE transactions
+            SET amount = {units}, content_hash = content_hash(date, type, {CATEGORY_NAME}, {units}, note)
+        """)
+        db.execute(f"""
+            UPDATE journal_rows
+            SET amount = {units}, content_hash = content_hash(date, type,
+                (SELECT name FROM categories WHERE categories.id = journal_rows.category_id), {units}, note)
+        """)
+        rebuild_daily_totals(db)
+        db.execute("UPDATE db_settings SET value = ? WHERE name = 'amount_precision'", (precision,))
+    logger.info(f"Amount precision changed from {old} to {precision} decimal places")
+    return precision
+
+def rebuild_daily_totals(db: Database) -> int:
+    """Recompute the daily_totals rollup from scratch; returns the number of rollup rows."""
+    with db.transaction():
+        db.execute("DELETE FROM daily_totals")
+        db.execute("""
+            INSERT INTO daily_totals (date, type, category_id, total, count)
+            SELECT date, type, COALESCE(category_id, 0), SUM(amount), COUNT(*)
+            FROM transactions
+            WHERE deleted_at IS NULL
+            GROUP BY date, type, COALESCE(category_id, 0)
+        """)
+        if db.fetchone("SELECT 1 FROM sqlite_master WHERE name = 'daily_balance'"):
+            rebuild_daily_balance(db)
+    return db.fetchone("SELECT COUNT(*) FROM daily_totals")[0]
+
+def find_hash_mismatches(db: Database) -> list:
+    """Ids of transactions whose stored content_hash no longer matches their fields."""
+    return [row[0] for row in db.fetchall(
+        f"SELECT id FROM transactions WHERE content_hash IS NOT content_hash(date, type, {CATEGORY_NAME}, amount, note)"
+    )]
+
+def rebuild_daily_balance(db: Database):
+    with db.transaction():
+        if db.fetchone("SELECT 1 FROM sqlite_master WHERE name = 'rollup_state'"):
+            db.execute("DELETE FROM rollup_state WHERE name = 'balance_dirty_from'")
+        db.execute("DELETE FROM daily_balance")
+        db.execute("""
+            INSERT INTO daily_balance (date, net, balance)
+            SELECT date, net, SUM(net) OVER (ORDER BY date)
+            FROM (
+                SELECT date,
+                SUM(CASE WHEN type='income' THEN total WHEN type='expense' THEN -total ELSE 0 END) AS net
+                FROM daily_totals
+                GROUP BY date
+            )
+        """)
+
+# rebuild_daily_totals() as it was for the text-category schema of versions 7-12,
+# so those migrations still apply step by step to old databases
+_REBUILD_DAILY_TOTALS_BY_NAME = [
+    "DELETE FROM daily_totals",
+    """
+    INSERT INTO daily_totals (date, type, category, total, count)
+    SELECT date, type, COALESCE(category, ''), SUM(amount), COUNT(*)
+    FROM transactions
+    GROUP BY date, type, COALESCE(category, '')
+    """,
+]
+
+# rebuild_daily_totals() and refresh_category_usage() as they were for schema
+# version 13, before transactions could be soft-deleted
+_REBUILD_DAILY_TOTALS_BY_ID = [
+    "DELETE FROM daily_totals",
+    """
+    INSERT INTO daily_totals (date, type, category_id, total, count)
+    SELECT date, type, COALESCE(category_id, 0), SUM(amount), COUNT(*)
+    FROM transactions
+    GROUP BY date, type, COALESCE(category_id, 0)
+    """,
+]
+_RECOUNT_CATEGORY_USAGE = """
+    UPDATE categories SET usage_count = used.count, last_used = used.last
+    FROM (
+        SELECT category_id, COUNT(*) AS count, MAX(date) AS last FROM transactions GROUP BY category_id
+    ) AS used
+    WHERE categories.id = used.category_id
+"""
+
+# Triggers keep daily_totals in step with every write to transactions; a NULL
+# category is rolled up under ''.
+_DAILY_TOTALS_ADD = """
+    INSERT INTO daily_totals (date, type, category, total, count)
+    VALUES (NEW.date, NEW.type, COALESCE(NEW.category, ''), NEW.amount, 1)
+    ON CONFLICT (date, type, category) DO UPDATE SET
+        total = total + excluded.total,
+        count = count + 1;
+"""
+_DAILY_TOTALS_REMOVE = """
+    UPDATE daily_totals SET total = total - OLD.amount, count = count - 1
+    WHERE date = OLD.date AND type = OLD.type AND category = COALESCE(OLD.category, '');
+    DELETE FROM daily_totals
+    WHERE date = OLD.date AND type = OLD.type AND category = COALESCE(OLD.category, '') AND count <= 0;
+"""
+
+# daily_balance holds the running balance at the end of each day that has
+# transactions, so a write on day D shifts the balance of every day >= D.
+# These run after the daily_totals statements in the same trigger, which lets
+# the remove step drop a day once its last rollup row is gone.
+_SIGNED_AMOUNT = "(CASE WHEN {row}.type='income' THEN {row}.amount WHEN {row}.type='expense' THEN -{row}.amount ELSE 0 END)"
+_DAILY_BALANCE_ADD = f"""
+    INSERT INTO daily_balance (date, net, balance)
+    VALUES (NEW.date, 0, COALESCE(
+        (SELECT balance FROM daily_balance WHERE date < NEW.date ORDER BY date DESC LIMIT 1), 0))
+    ON CONFLICT (date) DO NOTHING;
+    UPDATE daily_balance SET net = net + {_SIGNED_AMOUNT.format(row="NEW")} WHERE date = NEW.date;
+    UPDATE daily_balance SET balance = balance + {_SIGNED_AMOUNT.format(row="NEW")} WHERE date >= NEW.date;
+"""
+_DAILY_BALANCE_REMOVE = f"""
+    UPDATE daily_balance SET net = net - {_SIGNED_AMOUNT.format(row="OLD")} WHERE date = OLD.date;
+    UPDATE daily_balance SET balance = balance - {_SIGNED_AMOUNT.format(row="OLD")} WHERE date >= OLD.date;
+    DELETE FROM daily_balance
+    WHERE date = OLD.date AND NOT EXISTS (SELECT 1 FROM daily_totals WHERE date = OLD.date);
+"""
+
+# Shifting every later day on each write made bulk inserts O(rows x days).
+# Since schema version 9 the triggers only adjust the day's net and record the
+# earliest day whose running balance is stale; settle_daily_balance() brings
+# the balances up to date with one window pass before they are read.
+_MARK_BALANCE_DIRTY = """
+    INSERT INTO rollup_state (name, value) VALUES ('balance_dirty_from', {row}.date)
+    ON CONFLICT (name) DO UPDATE SET value = min(COALESCE(value, excluded.value), excluded.value);
+"""
+_DAILY_NET_ADD = f"""
+    INSERT INTO daily_balance (date, net, balance) VALUES (NEW.date, {_SIGNED_AMOUNT.format(row="NEW")}, 0)
+    ON CONFLICT (date) DO UPDATE SET net = net + excluded.net;
+    {_MARK_BALANCE_DIRTY.format(row="NEW")}
+"""
+_DAILY_NET_REMOVE = f"""
+    UPDATE daily_balance SET net = net - {_SIGNED_AMOUNT.format(row="OLD")} WHERE date = OLD.date;
+    DELETE FROM daily_balance
+    WHERE date = OLD.date AND NOT EXISTS (SELECT 1 FROM daily_totals WHERE date = OLD.date);
+    {_MARK_BALANCE_DIRTY.format(row="OLD")}
+"""
+
+# Since schema version 13 the rollups are keyed by category_id (0 when a
+# transaction has no category) and categories keep their own usage counts.
+_CATEGORY_TOTALS_ADD = """
+    INSERT INTO daily_totals (date, type, category_id, total, count)
+    VALUES (NEW.date, NEW.type, COALESCE(NEW.category_id, 0), NEW.amount, 1)
+    ON CONFLICT (date, type, category_id) DO UPDATE SET
+        total = total + excluded.total,
+        count = count + 1;
+"""
+_CATEGORY_TOTALS_REMOVE = """
+    UPDATE daily_totals SET total = total - OLD.amount, count = count - 1
+    WHERE date = OLD.date AND type = OLD.type AND category_id = COALESCE(OLD.category_id, 0);
+    DELETE FROM daily_totals
+    WHERE date = OLD.date AND type = OLD.type AND category_id = COALESCE(OLD.category_id, 0) AND count <= 0;
+"""
+_CATEGORY_USAGE_ADD = """
+    UPDATE categories SET usage_count = usage_count + 1, last_used = max(COALESCE(last_used, NEW.date), NEW.date)
+    WHERE id = NEW.category_id;
+"""
+_CATEGORY_USAGE_REMOVE = """
+    UPDATE categories SET usage_count = usage_count - 1,
+        last_used = (SELECT MAX(date) FROM transactions WHERE category_id = OLD.category_id)
+    WHERE id = OLD.category_id;
+"""
+
+# Since schema version 14 deleting a transaction first sets deleted_at, which
+# takes it out of the rollups and usage counts at once while it can still be
+# restored; purge_deleted() removes it for good. The triggers below only count
+# rows that are not soft-deleted, and a soft delete or restore is a remove or add.
+_LIVE_CATEGORY_USAGE_REMOVE = """
+    UPDATE categories SET usage_count = usage_count - 1,
+        last_used = (SELECT MAX(date) FROM transactions WHERE category_id = OLD.category_id AND deleted_at IS NULL)
+    WHERE id = OLD.category_id;
+"""
+
+def _live_row_triggers(suffix: str, columns: str, add: str, remove: str) -> list:
+    return [
+        f"DROP TRIGGER trg_transactions_insert_{suffix}",
+        f"DROP TRIGGER trg_transactions_delete_{suffix}",
+        f"DROP TRIGGER trg_transactions_update_{suffix}",
+        f"""
+        CREATE TRIGGER trg_transactions_insert_{suffix}
+        AFTER INSERT ON transactions WHEN NEW.deleted_at IS NULL BEGIN {add} END
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_delete_{suffix}
+        AFTER DELETE ON transactions WHEN OLD.deleted_at IS NULL BEGIN {remove} END
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_update_{suffix}
+        AFTER UPDATE OF {columns} ON transactions WHEN OLD.deleted_at IS NULL AND NEW.deleted_at IS NULL
+        BEGIN {remove} {add} END
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_soft_delete_{suffix}
+        AFTER UPDATE OF deleted_at ON transactions WHEN OLD.deleted_at IS NULL AND NEW.deleted_at IS NOT NULL
+        BEGIN {remove} END
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_restore_{suffix}
+        AFTER UPDATE OF deleted_at ON transactions WHEN OLD.deleted_at IS NOT NULL AND NEW.deleted_at IS NULL
+        BEGIN {add} END
+        """,
+    ]
+
+def settle_daily_balance(db: Database):
+    """Recompute running balances from the earliest day touched since the last settle."""
+    with db.transaction(immediate=True):
+        dirty = db.fetchone("SELECT value FROM rollup_state WHERE name = 'balance_dirty_from'")
+        if not dirty:
+            return
+        db.execute("""
+            WITH opening AS (
+                SELECT COALESCE((SELECT balance FROM daily_balance WHERE date < :from
+                                 ORDER BY date DESC LIMIT 1), 0) AS balance
+            ), running AS (
+                SELECT date, SUM(net) OVER (ORDER BY date) AS balance
+                FROM daily_balance WHERE date >= :from
+            )
+            UPDATE daily_balance
+            SET balance = (SELECT balance FROM opening) + running.balance
+            FROM running WHERE daily_balance.date = running.date
+        """, {"from": dirty[0]})
+        db.execute("DELETE FROM rollup_state WHERE name = 'balance_dirty_from'")
+
+ROLLUP_TRIGGERS = (
+    "trg_transactions_insert_daily_totals",
+    "trg_transactions_delete_daily_totals",
+    "trg_transactions_update_daily_totals",
+    "trg_transactions_soft_delete_daily_totals",
+    "trg_transactions_restore_daily_totals",
+)
+
+CATEGORY_USAGE_TRIGGERS = (
+    "trg_transactions_insert_category_usage",
+    "trg_transactions_delete_category_usage",
+    "trg_transactions_update_category_usage",
+    "trg_transactions_soft_delete_category_usage",
+    "trg_transactions_restore_category_usage",
+)
+
+NOTES_FTS_TRIGGERS = (
+    "trg_transactions_insert_notes_fts",
+    "trg_transactions_delete_notes_fts",
+    "trg_transactions_update_notes_fts",
+)
+
+@contextmanager
+def triggers_suspended(db: Database, names=ROLLUP_TRIGGERS):
+    """Drop the named triggers for the length of a bulk write, all in one transaction.
+
+    Per-row trigger upkeep dominates large imports, so the caller brings the
+    derived tables back in step itself (refresh_rollups_since or rebuild_daily_totals
+    for the rollups, refresh_notes_index_since for the notes index)."""
+    with db.transaction(immediate=True):
+        marks = ",".join("?" * len(names))
+        triggers = db.fetchall(f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN ({marks})",
+                               tuple(names))
+        for name, _ in triggers:
+            db.execute(f"DROP TRIGGER {name}")
+        yield db
+        for _, sql in triggers:
+            db.execute(sql)
+
+def refresh_rollups_since(db: Database, after_id: int):
+    """Fold transactions with id > after_id into the rollups, recomputing only the days they touch."""
+    with db.transaction():
+        db.execute("CREATE TEMP TABLE IF NOT EXISTS touched_dates (date TEXT PRIMARY KEY) WITHOUT ROWID")
+        db.execute("DELETE FROM temp.touched_dates")
+        db.execute("INSERT OR IGNORE INTO temp.touched_dates SELECT date FROM transactions WHERE id > ?", (after_id,))
+        db.execute("DELETE FROM daily_totals WHERE date IN (SELECT date FROM temp.touched_dates)")
+        db.execute("""
+            INSERT INTO daily_totals (date, type, category_id, total, count)
+            SELECT date, type, COALESCE(category_id, 0), SUM(amount), COUNT(*)
+            FROM transactions
+            WHERE date IN (SELECT date FROM temp.touched_dates) AND deleted_at IS NULL
+            GROUP BY date, type, COALESCE(category_id, 0)
+        """)
+        db.execute("DELETE FROM daily_balance WHERE date IN (SELECT date FROM temp.touched_dates)")
+        db.execute("""
+            INSERT INTO daily_balance (date, net, balance)
+            SELECT date, SUM(CASE WHEN type='income' THEN total WHEN type='expense' THEN -total ELSE 0 END), 0
+            FROM daily_totals
+            WHERE date IN (SELECT date FROM temp.touched_dates)
+            GROUP BY date
+        """)
+        db.execute("""
+            INSERT INTO rollup_state (name, value)
+            SELECT 'balance_dirty_from', MIN(date) FROM temp.touched_dates WHERE true HAVING COUNT(*) > 0
+            ON CONFLICT (name) DO UPDATE SET value = min(COALESCE(value, excluded.value), excluded.value)
+        """)
+
+# Notes are indexed by an external-content FTS5 table: it stores only the
+# inverted index and reads note text back from transactions by rowid. SQLite
+# builds without FTS5 skip the index and note search falls back to LIKE.
+_NOTES_FTS_REMOVE = """
+    INSERT INTO transactions_fts (transactions_fts, rowid, note) VALUES ('delete', OLD.id, OLD.note);
+"""
+_NOTES_FTS_ADD = """
+    INSERT INTO transactions_fts (rowid, note) VALUES (NEW.id, NEW.note);
+"""
+
+def _create_notes_index(db: Database):
+    try:
+        db.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+                note, content='transactions', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"FTS5 unavailable ({e}); note search will use LIKE scans")
+        return
+    db.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {NOTES_FTS_TRIGGERS[0]}
+        AFTER INSERT ON transactions BEGIN {_NOTES_FTS_ADD} END
+    """)
+    db.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {NOTES_FTS_TRIGGERS[1]}
+        AFTER DELETE ON transactions BEGIN {_NOTES_FTS_REMOVE} END
+    """)
+    db.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {NOTES_FTS_TRIGGERS[2]}
+        AFTER UPDATE OF note ON transactions BEGIN {_NOTES_FTS_REMOVE} {_NOTES_FTS_ADD} END
+    """)
+    rebuild_notes_index(db)
+
+def has_notes_index(db: Database) -> bool:
+    return db.fetchone("SELECT 1 FROM sqlite_master WHERE name = 'transactions_fts'") is not None
+
+def rebuild_notes_index(db: Database):
+    db.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+
+def refresh_notes_index_since(db: Database, after_id: int):
+    """Index the notes of transactions with id > after_id (written while the FTS triggers were suspended)."""
+    db.execute("INSERT INTO transactions_fts (rowid, note) SELECT id, note FROM transactions WHERE id > ?", (after_id,))
+
+def notes_match_query(text: str) -> str:
+    """FTS5 query matching every word of `text` as a prefix; '' when it has no words.
+
+    Each word is quoted, so operators and punctuation typed by the user are never parsed as query syntax."""
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text))
+
+NOTES_MATCH_CONDITION = "id IN (SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH ?)"
+# CROSS JOIN pins the FTS table as the outer loop. Left to itself the planner may
+# walk a type/date index instead and probe the FTS index once per row, which is
+# orders of magnitude slower for broad filters.
+NOTES_MATCH_JOIN = "transactions_fts CROSS JOIN transactions ON transactions.id = transactions_fts.rowid"
+
+def notes_condition(db: Database, text: str):
+    """WHERE condition and params matching `text` against transaction notes."""
+    query = notes_match_query(text) if has_notes_index(db) else ""
+    if query:
+        return NOTES_MATCH_CONDITION, [query]
+    return "note LIKE ?", [f"%{text}%"]
+
+# Categories are rows of their own since schema version 13; transactions point
+# at them by id. Names are stored canonically, like types. A category removed
+# from the lists while transactions still use it is hidden rather than deleted.
+CATEGORY_NAME = "(SELECT name FROM categories WHERE categories.id = transactions.category_id)"
+
+def category_names(db: Database, type_=None, by_usage: bool = True) -> list:
+    """Visible category names (title case) of a type, or of both types merged; most used first."""
+    if type_ is None:
+        rows = db.fetchall("""
+            SELECT name FROM categories WHERE NOT hidden
+            GROUP BY name ORDER BY SUM(usage_count) DESC, MIN(sort_order), name
+        """)
+    else:
+        order = "usage_count DESC, sort_order, name" if by_usage else "sort_order, name"
+        rows = db.fetchall(f"SELECT name FROM categories WHERE type = ? AND NOT hidden ORDER BY {order}",
+                           (canonical_label(type_),))
+    return [name.title() for name, in rows]
+
+def category_id(db: Database, type_, name):
+    """Id of the (type, name) category, added to the end of its list when new; None for no category."""
+    type_, name = canonical_label(type_), canonical_label(name)
+    if not name:
+        return None
+    row = db.fetchone("SELECT id FROM categories WHERE type = ? AND name = ?", (type_, name))
+    if row:
+        return row[0]
+    return db.execute("""
+        INSERT INTO categories (type, name, sort_order)
+        VALUES (?1, ?2, (SELECT COALESCE(MAX(sort_order), -1) + 1 FROM categories WHERE type = ?1))
+    """, (type_, name)).lastrowid
+
+def save_category_list(db: Database, type_, names):
+    """Make `names` the visible categories of a type, in that order."""
+    type_ = canonical_label(type_)
+    with db.transaction():
+        db.execute("UPDATE categories SET hidden = 1 WHERE type = ?", (type_,))
+        db.executemany("""
+            INSERT INTO categories (type, name, sort_order) VALUES (?, ?, ?)
+            ON CONFLICT (type, name) DO UPDATE SET sort_order = excluded.sort_order, hidden = 0
+        """, [(type_, canonical_label(name), order) for order, name in enumerate(names)])
+        # usage_count leaves out soft-deleted rows, and journal images may bring rows back
+        db.execute("""
+            DELETE FROM categories
+            WHERE type = ? AND hidden AND usage_count = 0
+                AND NOT EXISTS (SELECT 1 FROM transactions WHERE category_id = categories.id)
+                AND id NOT IN (SELECT category_id FROM journal_rows WHERE category_id IS NOT NULL)
+        """, (type_,))
+
+def refresh_category_usage(db: Database, after_id: int = 0):
+    """Fold transactions with id > after_id into the category usage stats; recount everything by default."""
+    with db.transaction():
+        if not after_id:
+            db.execute("UPDATE categories SET usage_count = 0, last_used = NULL")
+        db.execute("""
+            UPDATE categories
+            SET usage_count = usage_count + used.count, last_used = max(COALESCE(last_used, used.last), used.last)
+            FROM (
+                SELECT category_id, COUNT(*) AS count, MAX(date) AS last
+                FROM transactions WHERE id > ? AND deleted_at IS NULL GROUP BY category_id
+            ) AS used
+            WHERE categories.id = used.category_id
+        """, (after_id,))
+
+def purge_deleted(db: Database, older_than: float = 0) -> list:
+    """Delete every transaction soft-deleted at least `older_than` seconds ago, in one statement.
+
+    Returns the (id, date) of each purged row."""
+    with db.transaction():
+        return db.fetchall(
+            "DELETE FROM transactions WHERE deleted_at <= strftime('%Y-%m-%d %H:%M:%f', 'now', ?) RETURNING id, date",
+            (f"-{older_than} seconds",))
+
+# Bulk edits from the Transaction Log: one UPDATE for the whole selection, with
+# the content hash recomputed from the new values in the same statement, as one
+# journal entry. Soft-deleted rows are left alone. Each returns the rows'
+# (id, date) before and after the change.
+_SELECTED_IDS = "IN (SELECT value FROM json_each(?))"
+
+def _snapshot_transactions(db: Database, ids: str) -> list:
+    return db.fetchall(f"SELECT id, date FROM transactions WHERE id {_SELECTED_IDS} AND deleted_at IS NULL", (ids,))
+
+def recategorize_transactions(db: Database, ids, name: str):
+    """Move the transactions to category `name` of their own type, creating it where it is missing."""
+    ids = list(ids)
+    with journal_entry(db, f"Change category of {len(ids)} transaction(s) to {name.strip().title()}", ids):
+        ids = json.dumps(ids)
+        before = _snapshot_transactions(db, ids)
+        for type_, in db.fetchall(f"SELECT DISTINCT type FROM transactions WHERE id {_SELECTED_IDS}", (ids,)):
+            category_id(db, type_, name)
+        after = db.fetchall(f"""
+            UPDATE transactions
+            SET category_id = c.id,
+                content_hash = content_hash(transactions.date, transactions.type, c.name, amount, note)
+            FROM categories AS c
+            WHERE c.type = transactions.type AND c.name = ?
+                AND transactions.id {_SELECTED_IDS} AND transactions.deleted_at IS NULL
+            RETURNING transactions.id, transactions.date
+        """, (canonical_label(name), ids))
+    return before, after
+
+def shift_transaction_dates(db: Database, ids, days: int):
+    """Move the transactions `days` days later (earlier when negative)."""
+    ids = list(ids)
+    shift = f"{int(days):+d} days"
+    with journal_entry(db, f"Shift {len(ids)} transaction(s) by {shift}", ids):
+        ids = json.dumps(ids)
+        before = _snapshot_transactions(db, ids)
+        after = db.fetchall(f"""
+            UPDATE transactions
+            SET date = date(date, ?),
+                content_hash = content_hash(date(date, ?), type, {CATEGORY_NAME}, amount, note)
+            WHERE id {_SELECTED_IDS} AND deleted_at IS NULL
+            RETURNING id, date
+        """, (shift, shift, ids))
+    return before, after
+
+# The journal records every write to transactions as an undoable command. An
+# entry keeps images of the rows it touched as they were before and after it
+# (no image: the row did not exist), so undo and redo replay either side with
+# one DELETE and one upsert. Imports are too large to image up front: their
+# rows carry the entry id in transactions.batch_id instead, undo removes them
+# with one DELETE keyed on it and keeps their images for a redo.
+_IMAGE_COLUMNS = "id, date, type, category_id, amount, note, content_hash, deleted_at, batch_id"
+
+class JournalEntry:
+    """The journal entry of a command in progress; add the ids of rows it inserts to `ids`."""
+
+    def __init__(self, entry_id: int, ids=()):
+        self.id = entry_id
+        self.ids = set(ids)
+
+def _start_journal_entry(db: Database, label: str, batch: bool = False) -> int:
+    # A new command ends the redo history
+    db.execute("DELETE FROM journal WHERE undone")
+    return db.execute("INSERT INTO journal (label, batch) VALUES (?, ?)", (label, int(batch))).lastrowid
+
+def _capture_images(db: Database, entry_id: int, side: str, where: str, params):
+    db.execute(f"""
+        INSERT INTO journal_rows (entry_id, side, {_IMAGE_COLUMNS})
+        SELECT ?, ?, {_IMAGE_COLUMNS} FROM transactions WHERE {where}
+    """, (entry_id, side, *params))
+
+@contextmanager
+def journal_entry(db: Database, label: str, ids=()):
+    """Record the writes made inside the block as one undoable command, in the same transaction.
+
+    The rows in `ids`, plus any the block adds to the yielded entry's ids, are imaged
+    before and after the block."""
+    with db.transaction():
+        entry = JournalEntry(_start_journal_entry(db, label), ids)
+        _capture_images(db, entry.id, "before", f"id {_SELECTED_IDS}", (json.dumps(list(entry.ids)),))
+        yield entry
+        _capture_images(db, entry.id, "after", f"id {_SELECTED_IDS}", (json.dumps(list(entry.ids)),))
+
+def journal_batch(db: Database, label: str) -> int:
+    """Start a journal entry for a bulk insert; the rows it inserts must carry the returned id as batch_id."""
+    with db.transaction():
+        return _start_journal_entry(db, label, batch=True)
+
+def _apply_images(db: Database, entry_id: int, side: str):
+    other = "after" if side == "before" else "before"
+    db.execute("""
+        DELETE FROM transactions WHERE id IN (
+            SELECT id FROM journal_rows WHERE entry_id = ?1 AND side = ?2
+            EXCEPT SELECT id FROM journal_rows WHERE entry_id = ?1 AND side = ?3
+        )
+    """, (entry_id, other, side))
+    # A row replayed as deleted starts a fresh undo window rather than being purged at once
+    db.execute(f"""
+        INSERT INTO transactions ({_IMAGE_COLUMNS})
+        SELECT id, date, type, category_id, amount, note, content_hash,
+               CASE WHEN deleted_at IS NOT NULL THEN strftime('%Y-%m-%d %H:%M:%f', 'now') END, batch_id
+        FROM journal_rows WHERE entry_id = ? AND side = ?
+        ON CONFLICT (id) DO UPDATE SET
+            date = excluded.date, type = excluded.type, category_id = excluded.category_id,
+            amount = excluded.amount, note = excluded.note, content_hash = excluded.content_hash,
+            deleted_at = excluded.deleted_at, batch_id = excluded.batch_id
+    """, (entry_id, side))
+
+def _journal_changes(db: Database, entry_id: int, side: str):
+    rows = db.fetchall("SELECT id, side, date FROM journal_rows WHERE entry_id = ?", (entry_id,))
+    present = {rid for rid, row_side, _ in rows if row_side == side}
+    return ChangeSet(updated=present, deleted={rid for rid, _, _ in rows} - present, dates=[d for _, _, d in rows])
+
+def journal_labels(db: Database) -> tuple:
+    """Labels of the commands undo and redo would replay next (None when there is none)."""
+    undo = db.fetchone("SELECT label FROM journal WHERE NOT undone ORDER BY id DESC LIMIT 1")
+    redo = db.fetchone("SELECT label FROM journal WHERE undone ORDER BY id LIMIT 1")
+    return (undo[0] if undo else None), (redo[0] if redo else None)
+
+def journal_undo(db: Database):
+    """Revert the newest command in one transaction; returns (label, ChangeSet), or None with nothing to undo."""
+    with db.transaction(immediate=True):
+        entry = db.fetchone("SELECT id, label, batch FROM journal WHERE NOT undone ORDER BY id DESC LIMIT 1")
+        if not entry:
+            return None
+        entry_id, label, batch = entry
+        if batch:
+            _capture_images(db, entry_id, "after", "batch_id = ?", (entry_id,))
+            db.execute("DELETE FROM transactions WHERE batch_id = ?", (entry_id,))
+            changes = ChangeSet(full=True)
+        else:
+            changes = _journal_changes(db, entry_id, "before")
+            _apply_images(db, entry_id, "before")
+        db.execute("UPDATE journal SET undone = 1 WHERE id = ?", (entry_id,))
+    return label, changes
+
+def journal_redo(db: Database):
+    """Replay the oldest undone command in one transaction; returns (label, ChangeSet), or None with nothing to redo."""
+    with db.transaction(immediate=True):
+        entry = db.fetchone("SELECT id, label, batch FROM journal WHERE undone ORDER BY id LIMIT 1")
+        if not entry:
+            return None
+        entry_id, label, batch = entry
+        if batch:
+            _apply_images(db, entry_id, "after")
+            db.execute("DELETE FROM journal_rows WHERE entry_id = ?", (entry_id,))
+            changes = ChangeSet(full=True)
+        else:
+            changes = _journal_changes(db, entry_id, "after")
+            _apply_images(db, entry_id, "after")
+        db.execute("UPDATE journal SET undone = 0 WHERE id = ?", (entry_id,))
+    return label, changes
+
+def _migrate_category_ids(db: Database):
+    db.execute("""
+        CREATE TABLE categories (
+            id INTEGER PRIMARY KEY,
+            type TEXT NOT NULL CHECK (type = lower(trim(type))),
+            name TEXT NOT NULL CHECK (name = lower(trim(name)) AND name <> ''),
+            sort_order INTEGER NOT NULL DEFAULT 0,
+            usage_count INTEGER NOT NULL DEFAULT 0,
+            last_used DATETIME,
+            hidden INTEGER NOT NULL DEFAULT 0 CHECK (hidden IN (0, 1)),
+            UNIQUE (type, name)
+        )
+    """)
+    # Until now the category lists lived in QSettings as one JSON blob
+    lists = dict(DEFAULT_CATEGORIES)
+    stored = app_settings().value("categories")
+    try:
+        data = json.loads(stored) if stored else {}
+        if not isinstance(data, dict):
+            raise ValueError
+        lists.update((key, names) for key, names in data.items() if isinstance(names, list) and names)
+    except Exception:
+        logger.warning("Stored categories are unreadable; starting from the defaults")
+    db.executemany(
+        "INSERT INTO categories (type, name, sort_order) VALUES (?, ?, ?) ON CONFLICT (type, name) DO NOTHING",
+        [(canonical_label(key), canonical_label(name), order)
+         for key, names in lists.items() for order, name in enumerate(names) if canonical_label(name)]
     )
+    # Names only found on transactions had been taken off the lists
+    db.execute("""
+        INSERT INTO categories (type, name, hidden)
+        SELECT DISTINCT type, category, 1 FROM transactions WHERE category <> ''
+        ON CONFLICT (type, name) DO NOTHING
+    """)
+    for name in ROLLUP_TRIGGERS:
+        db.execute(f"DROP TRIGGER IF EXISTS {name}")
+    db.execute("DROP INDEX IF EXISTS idx_transactions_category_date")
+    _rebuild_transactions_table(db, """
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL CHECK (type = lower(trim(type))),
+            amount INTEGER NOT NULL CHECK (typeof(amount) = 'integer'),
+            category_id INTEGER REFERENCES categories (id),
+            date DATETIME NOT NULL,
+            note TEXT,
+            content_hash BLOB
+        )
+    """, """
+        INSERT INTO transactions_new (id, type, amount, category_id, date, note, content_hash)
+        SELECT t.id, t.type, t.amount, c.id, t.date, t.note, t.content_hash
+        FROM transactions AS t LEFT JOIN categories AS c ON c.type = t.type AND c.name = t.category
     """)
-    conn.commit()
-    conn.close()
+
+# (version, description, steps) - applied in order when PRAGMA user_version is
+# below `version`. Steps are SQL statements and/or callables taking the Database.
+MIGRATIONS = [
+    (1, "create transactions table", [
+        """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL,
+            amount REAL NOT NULL,
+            category TEXT,
+            date DATETIME NOT NULL,
+            note TEXT
+        )
+        """,
+    ]),
+    (2, "index transactions on (date, id)", [
+        "CREATE INDEX IF NOT EXISTS idx_transactions_date_id ON transactions(date, id)",
+    ]),
+    (3, "index transactions on (type, date)", [
+        "CREATE INDEX IF NOT EXISTS idx_transactions_type_date ON transactions(type, date)",
+    ]),
+    (4, "index transactions on (category, date)", [
+        "CREATE INDEX IF NOT EXISTS idx_transactions_category_date ON transactions(category, date)",
+    ]),
+    (5, "dedup index on (date, type, category, amount, note)", [
+        "CREATE INDEX IF NOT EXISTS idx_transactions_dedup ON transactions(date, type, category, amount, note)",
+    ]),
+    (6, "canonicalize type/category casing", _migrate_canonical_labels),
+    (7, "daily_totals rollup maintained by triggers", [
+        """
+        CREATE TABLE IF NOT EXISTS daily_totals (
+            date TEXT NOT NULL,
+            type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total REAL NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (date, type, category)
+        ) WITHOUT ROWID
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_insert_daily_totals
+        AFTER INSERT ON transactions BEGIN {_DAILY_TOTALS_ADD} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_delete_daily_totals
+        AFTER DELETE ON transactions BEGIN {_DAILY_TOTALS_REMOVE} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_update_daily_totals
+        AFTER UPDATE OF date, type, category, amount ON transactions
+        BEGIN {_DAILY_TOTALS_REMOVE} {_DAILY_TOTALS_ADD} END
+        """,
+        *_REBUILD_DAILY_TOTALS_BY_NAME,
+    ]),
+    (8, "daily_balance running balance maintained by triggers", [
+        """
+        CREATE TABLE IF NOT EXISTS daily_balance (
+            date TEXT PRIMARY KEY,
+            net REAL NOT NULL,
+            balance REAL NOT NULL
+        ) WITHOUT ROWID
+        """,
+        "DROP TRIGGER IF EXISTS trg_transactions_insert_daily_totals",
+        "DROP TRIGGER IF EXISTS trg_transactions_delete_daily_totals",
+        "DROP TRIGGER IF EXISTS trg_transactions_update_daily_totals",
+        f"""
+        CREATE TRIGGER trg_transactions_insert_daily_totals
+        AFTER INSERT ON transactions BEGIN {_DAILY_TOTALS_ADD} {_DAILY_BALANCE_ADD} END
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_delete_daily_totals
+        AFTER DELETE ON transactions BEGIN {_DAILY_TOTALS_REMOVE} {_DAILY_BALANCE_REMOVE} END
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_update_daily_totals
+        AFTER UPDATE OF date, type, category, amount ON transactions
+        BEGIN {_DAILY_TOTALS_REMOVE} {_DAILY_BALANCE_REMOVE} {_DAILY_TOTALS_ADD} {_DAILY_BALANCE_ADD} END
+        """,
+        rebuild_daily_balance,
+    ]),
+    (9, "settle daily_balance lazily instead of on every write", [
+        """
+        CREATE TABLE IF NOT EXISTS rollup_state (
+            name TEXT PRIMARY KEY,
+            value TEXT
+        ) WITHOUT ROWID
+        """,
+        "DROP TRIGGER IF EXISTS trg_transactions_insert_daily_totals",
+        "DROP TRIGGER IF EXISTS trg_transactions_delete_daily_totals",
+        "DROP TRIGGER IF EXISTS trg_transactions_update_daily_totals",
+        f"""
+        CREATE TRIGGER trg_transactions_insert_daily_totals
+        AFTER INSERT ON transactions BEGIN {_DAILY_TOTALS_ADD} {_DAILY_NET_ADD} END
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_delete_daily_totals
+        AFTER DELETE ON transactions BEGIN {_DAILY_TOTALS_REMOVE} {_DAILY_NET_REMOVE} END
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_update_daily_totals
+        AFTER UPDATE OF date, type, category, amount ON transactions
+        BEGIN {_DAILY_TOTALS_REMOVE} {_DAILY_NET_REMOVE} {_DAILY_TOTALS_ADD} {_DAILY_NET_ADD} END
+        """,
+    ]),
+    (10, "content_hash column replaces the five-column dedup index", [
+        "ALTER TABLE transactions ADD COLUMN content_hash BLOB",
+        "UPDATE transactions SET content_hash = content_hash(date, type, category, amount, note)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_content_hash ON transactions(content_hash)",
+        "DROP INDEX IF EXISTS idx_transactions_dedup",
+    ]),
+    (11, "store amounts as integer minor units", [
+        """
+        CREATE TABLE IF NOT EXISTS db_settings (
+            name TEXT PRIMARY KEY,
+            value
+        ) WITHOUT ROWID
+        """,
+        f"INSERT OR IGNORE INTO db_settings (name, value) VALUES ('amount_precision', {AMOUNT_PRECISION})",
+        "DROP TABLE daily_totals",
+        """
+        CREATE TABLE daily_totals (
+            date TEXT NOT NULL,
+            type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (date, type, category)
+        ) WITHOUT ROWID
+        """,
+        "DROP TABLE daily_balance",
+        """
+        CREATE TABLE daily_balance (
+            date TEXT PRIMARY KEY,
+            net INTEGER NOT NULL,
+            balance INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """,
+        _migrate_integer_amounts,
+        *_REBUILD_DAILY_TOTALS_BY_NAME,
+        rebuild_daily_balance,
+    ]),
+    (12, "full-text index on notes", _create_notes_index),
+    (13, "categories table referenced by id", [
+        _migrate_category_ids,
+        "CREATE INDEX idx_transactions_category_date ON transactions(category_id, date)",
+        "DROP TABLE daily_totals",
+        """
+        CREATE TABLE daily_totals (
+            date TEXT NOT NULL,
+            type TEXT NOT NULL,
+            category_id INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (date, type, category_id)
+        ) WITHOUT ROWID
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_insert_daily_totals
+        AFTER INSERT ON transactions BEGIN {_CATEGORY_TOTALS_ADD} {_DAILY_NET_ADD} END
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_delete_daily_totals
+        AFTER DELETE ON transactions BEGIN {_CATEGORY_TOTALS_REMOVE} {_DAILY_NET_REMOVE} END
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_update_daily_totals
+        AFTER UPDATE OF date, type, category_id, amount ON transactions
+        BEGIN {_CATEGORY_TOTALS_REMOVE} {_DAILY_NET_REMOVE} {_CATEGORY_TOTALS_ADD} {_DAILY_NET_ADD} END
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_insert_category_usage
+        AFTER INSERT ON transactions BEGIN {_CATEGORY_USAGE_ADD} END
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_delete_category_usage
+        AFTER DELETE ON transactions BEGIN {_CATEGORY_USAGE_REMOVE} END
+        """,
+        f"""
+        CREATE TRIGGER trg_transactions_update_category_usage
+        AFTER UPDATE OF date, category_id ON transactions BEGIN {_CATEGORY_USAGE_REMOVE} {_CATEGORY_USAGE_ADD} END
+        """,
+        *_REBUILD_DAILY_TOTALS_BY_ID,
+        rebuild_daily_balance,
+        _RECOUNT_CATEGORY_USAGE,
+    ]),
+    (14, "soft-deleted transactions", [
+        "ALTER TABLE transactions ADD COLUMN deleted_at DATETIME",
+        "CREATE INDEX idx_transactions_deleted_at ON transactions(deleted_at) WHERE deleted_at IS NOT NULL",
+        *_live_row_triggers("daily_totals", "date, type, category_id, amount",
+                            f"{_CATEGORY_TOTALS_ADD} {_DAILY_NET_ADD}",
+                            f"{_CATEGORY_TOTALS_REMOVE} {_DAILY_NET_REMOVE}"),
+        *_live_row_triggers("category_usage", "date, category_id",
+                            _CATEGORY_USAGE_ADD, _LIVE_CATEGORY_USAGE_REMOVE),
+    ]),
+    (15, "command journal for undo/redo", [
+        # AUTOINCREMENT: entry ids tag imported rows, so they must never be reused
+        """
+        CREATE TABLE journal (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            label TEXT NOT NULL,
+            batch INTEGER NOT NULL DEFAULT 0 CHECK (batch IN (0, 1)),
+            undone INTEGER NOT NULL DEFAULT 0 CHECK (undone IN (0, 1)),
+            created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE journal_rows (
+            entry_id INTEGER NOT NULL REFERENCES journal (id) ON DELETE CASCADE,
+            side TEXT NOT NULL CHECK (side IN ('before', 'after')),
+            id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            type TEXT NOT NULL,
+            category_id INTEGER,
+            amount INTEGER NOT NULL,
+            note TEXT,
+            content_hash BLOB,
+            deleted_at DATETIME,
+            batch_id INTEGER,
+            PRIMARY KEY (entry_id, side, id)
+        ) WITHOUT ROWID
+        """,
+        "ALTER TABLE transactions ADD COLUMN batch_id INTEGER",
+        "CREATE INDEX idx_transactions_batch_id ON transactions(batch_id) WHERE batch_id IS NOT NULL",
+    ]),
+]
+
+def run_migrations(db: Database) -> list:
+    current = db.fetchone("PRAGMA user_version")[0]
+    report = []
+    for version, description, steps in MIGRATIONS:
+        if version <= current:
+            continue
+        started = time.perf_counter()
+        with db.transaction():
+            for step in ([steps] if callable(steps) else steps):
+                if callable(step):
+                    step(db)
+                else:
+                    db.execute(step)
+            db.execute(f"PRAGMA user_version = {int(version)}")
+        elapsed = time.perf_counter() - started
+        report.append((version, description, elapsed))
+        logger.info(f"Migration {version} ({description}) applied in {elapsed * 1000:.1f} ms")
+    if not report:
+        logger.debug(f"Database schema up to date (version {current})")
+    return report
+
+def create_db(db: Database):
+    run_migrations(db)
+    db.amount_precision = stored_amount_precision(db)
+    # Deletions still pending when the app last exited (or crashed) are final now
+    purged = purge_deleted(db)
+    if purged:
+        logger.info(f"Purged {len(purged)} transaction(s) deleted in a previous session")
+    db.execute("PRAGMA optimize")
+
+DEFAULT_DATE_FORMAT = "(YYYY-MM-DD) | Year-Month-Day"
+# Seeded into the categories table when it is created
+DEFAULT_CATEGORIES = {
+    "Income": ["Salary", "Gift", "Bonus", "Other"],
+    "Expense": ["Food", "Rent", "Utilities", "Transport", "Misc"]
+}
+
+class AppSettings(QObject):
+    """Process-wide cache in front of QSettings("Azralithia", "FinanceTracker"), or the given `store`.
+
+    Each key is read from QSettings once; setValue() writes through, updates the
+    cache and emits `changed`, so widgets and cell formatting never go back to it."""
+    changed = pyqtSignal(str, object)
+
+    _MISSING = object()
+
+    def __init__(self, store: QSettings = None, parent=None):
+        super().__init__(parent)
+        self._settings = store if store is not None else QSettings("Azralithia", "FinanceTracker")
+        self._cache = {}        # (key, type) -> value, or _MISSING when the key is unset
+        self.reads = 0
+        self.format_date = date_formatter(map_display_format(self.value("date_format", DEFAULT_DATE_FORMAT)))
+
+    def value(self, key: str, default=None, type=None):
+        cached = self._cache.get((key, type))
+        if cached is None:
+            self.reads += 1
+            if not self._settings.contains(key):
+                cached = self._MISSING
+            elif type is None:
+                cached = self._settings.value(key)
+            else:
+                cached = self._settings.value(key, type=type)
+            self._cache[(key, type)] = cached
+        return default if cached is self._MISSING else cached
+
+    def setValue(self, key: str, value):
+        if self.value(key, self._MISSING) == value:
+            return
+        self._settings.setValue(key, value)
+        for cache_key in [k for k in self._cache if k[0] == key]:
+            del self._cache[cache_key]
+        if key == "date_format":
+            self.format_date = date_formatter(map_display_format(value))
+        self.changed.emit(key, value)
+
+_app_settings = None
+
+def app_settings(store: QSettings = None) -> AppSettings:
+    """The process-wide AppSettings; a `store` can only be given to the call that creates it."""
+    global _app_settings
+    if _app_settings is None:
+        _app_settings = AppSettings(store)
+    elif store is not None:
+        raise RuntimeError("App settings are already in use")
+    return _app_settings
 
 def map_display_format(display_format: str) -> str:
     if display_format == "(DD-MM-YYYY) | Day-Month-Year":
@@ -361,23 +1735,41 @@ def graph_format(display_format: str) -> str:
         return "%Y-%d-%m"
     return "%Y-%m-%d" # Default to Year-Month-Day
 
+def date_formatter(display_format: str):
+    """Compile a renderer for stored yyyy-MM-dd dates in a map_display_format() format."""
+    template = {
+        "dd-MM-yyyy": "{2}-{1}-{0}",
+        "MM-dd-yyyy": "{1}-{2}-{0}",
+        "yyyy-dd-MM": "{0}-{2}-{1}",
+    }.get(display_format)
+    if template is None:
+        return str  # stored dates are already Year-Month-Day
+    render = template.format
+
+    def format_date(date_str: str) -> str:
+        parts = date_str.split("-")
+        return render(*parts) if len(parts) == 3 else date_str
+    return format_date
+
 def format_date_for_display(date_str: str) -> str:
-    s = QSettings("Azralithia", "FinanceTracker").value("date_format", "(YYYY-MM-DD) | Year-Month-Day")
-    
-    if " | " in s:
-        s = s.split(" | ")[0].strip("()") 
-    try:
-        y, m, d = date_str.split("-")
-    except Exception:
-        return date_str
-    
-    if s == "DD-MM-YYYY":
-        return f"{d}-{m}-{y}"
-    if s == "MM-DD-YYYY":
-        return f"{m}-{d}-{y}"
-    if s == "YYYY-DD-MM":
-        return f"{y}-{d}-{m}"
-    return f"{y}-{m}-{d}" # Default to Year-Month-Day
+    return app_settings().format_date(date_str)
+
+def downsample_minmax(x, y, max_points: int = GRAPH_MAX_POINTS):
+    """Keep the min and max of each bucket so spikes survive while the point count stays bounded."""
+    n = len(x)
+    if n <= max_points:
+        return x, y
+    buckets = max(1, (max_points - 2) // 2)
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    grid = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    valid = offsets < n
+    lo = np.nanargmin(grid[valid], axis=1) + offsets[valid]
+    hi = np.nanargmax(grid[valid], axis=1) + offsets[valid]
+    keep = np.unique(np.concatenate(([0, n - 1], lo, hi)))
+    return x[keep], y[keep]
 
 def resource_path(relative_path: str) -> str:
     try:
@@ -386,12 +1778,447 @@ def resource_path(relative_path: str) -> str:
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+# --- Models / Delegates ---
+# Search matches inside a note snippet are wrapped in these (char(2)/char(3) in
+# the snippet() call); HighlightDelegate paints them bold
+HIGHLIGHT_START, HIGHLIGHT_END = "\x02", "\x03"
+HIGHLIGHT_ROLE = Qt.ItemDataRole.UserRole + 1
+
+class TransactionTableModel(QAbstractTableModel):
+    """Read-only transaction rows fetched lazily in keyset batches (newest first).
+
+    With a notes search set the rows come from the FTS index instead, best match
+    first, and carry a highlighted snippet of the note plus their relevance."""
+    rows_fetched = pyqtSignal(int)
+
+    ORDER_COLUMNS = ("date", "id")
+    SEARCH_ORDER_COLUMNS = ("relevance", "date", "id")
+    ORDER_EXPRESSIONS = {"relevance": "-bm25(transactions_fts)", "id": "transactions.id"}
+    SNIPPET_TOKENS = 16
+
+    COLUMN_TITLES = {
+        "id": "ID", "date": "Date", "type": "Type", "category": "Category",
+        "amount": "Amount", "note": "Note", "actions": "Actions"
+    }
+    FIELD_INDEX = {"id": 0, "date": 1, "type": 2, "category": 3, "amount": 4, "note": 5, "relevance": 6}
+
+    def __init__(self, db: Database, columns, batch_size=200, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self._rows = []
+        self._display = []
+        self._where = ""
+        self._params = []
+        self._search = ""
+        self._exhausted = True
+
+    # -=- Qt model API -=-
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMN_TITLES[self.columns[section]]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display[index.row()][index.column()]
+        if role == Qt.ItemDataRole.UserRole:
+            return self._rows[index.row()][0]
+        if role == HIGHLIGHT_ROLE and self.columns[index.column()] == "note":
+            return self._rows[index.row()][5]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not parent.isValid():
+            self._fetch(self.batch_size)
+
+    def fetch_up_to(self, count: int):
+        """Load rows with one query until `count` are loaded or the filter runs out."""
+        if len(self._rows) < count:
+            self._fetch(count - len(self._rows))
+
+    def _fetch(self, limit: int):
+        if self._exhausted:
+            return
+        anchor = self._sort_key(self._rows[-1]) if self._rows else None
+        rows = self._query(limit, anchor)
+        self._exhausted = len(rows) < limit
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self._display.extend(self._format_row(r) for r in rows)
+            self.endInsertRows()
+        self.rows_fetched.emit(len(self._rows))
+
+    # -=- Loading -=-
+    def set_filter(self, where: str, params, search: str = "", rows=None):
+        """`search` is an FTS5 query over notes (see notes_match_query); it needs the notes index.
+
+        `rows` is the first batch when the caller already fetched it with query_rows(),
+        e.g. on a worker thread; otherwise it is read here."""
+        self.beginResetModel()
+        self._where, self._params, self._search = where, list(params), search
+        self._rows, self._display = [], []
+        self._exhausted = False
+        if rows is not None:
+            self._rows = list(rows)
+            self._display = [self._format_row(r) for r in self._rows]
+            self._exhausted = len(self._rows) < self.batch_size
+        self.endResetModel()
+        if rows is None:
+            self.fetchMore()
+        else:
+            self.rows_fetched.emit(len(self._rows))
+
+    def filter_key(self):
+        return (self._where, tuple(self._params), self._search)
+
+    def refresh(self):
+        # Re-read the span already loaded and apply only what differs, so the
+        # view keeps its scroll position and untouched rows are not repainted.
+        limit = max(len(self._rows), self.batch_size)
+        rows = self._query(limit)
+        self._exhausted = len(rows) < limit
+        self._replace_rows(rows)
+        self.rows_fetched.emit(len(self._rows))
+
+    def reformat(self):
+        self._display = [self._format_row(r) for r in self._rows]
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._rows) - 1, len(self.columns) - 1))
+
+    def apply_changes(self, inserted=(), updated=(), deleted=()):
+        """Patch the loaded rows for the given transaction ids without re-querying the span."""
+        changed = set(inserted) | set(updated)
+        fresh = {r[0]: r for r in self._fetch_ids(changed)} if changed else {}
+        gone = set(deleted) | (changed - fresh.keys())
+        rows = [fresh.pop(r[0], r) for r in self._rows if r[0] not in gone]
+        # New rows are only placed if they sort inside the span loaded so far;
+        # anything older is picked up by fetchMore.
+        tail = self._sort_key(self._rows[-1]) if self._rows and not self._exhausted else None
+        rows.extend(r for r in fresh.values() if tail is None or self._sort_key(r) > tail)
+        rows.sort(key=self._sort_key, reverse=True)
+        self._replace_rows(rows)
+        self.rows_fetched.emit(len(self._rows))
+
+    def refresh_actions(self):
+        if "actions" in self.columns and self._rows:
+            col = self.columns.index("actions")
+            self.dataChanged.emit(self.index(0, col), self.index(len(self._rows) - 1, col))
+
+    @classmethod
+    def _order_columns(cls, search):
+        return cls.SEARCH_ORDER_COLUMNS if search else cls.ORDER_COLUMNS
+
+    def _sort_key(self, row):
+        return tuple(row[self.FIELD_INDEX[c]] for c in self._order_columns(self._search))
+
+    @classmethod
+    def _source(cls, where, params, search):
+        """(SELECT ... FROM ..., WHERE clause, params) for a filter."""
+        if not search:
+            return f"SELECT id, date, type, {CATEGORY_NAME}, amount, COALESCE(note,'') FROM transactions", \
+                where, list(params)
+        cond = "transactions_fts MATCH ?"
+        return f"""SELECT transactions.id, date, type, {CATEGORY_NAME}, amount,
+                       COALESCE(snippet(transactions_fts, 0, char(2), char(3), '…', {cls.SNIPPET_TOKENS}), ''),
+                       -bm25(transactions_fts)
+                   FROM {NOTES_MATCH_JOIN}""", \
+            f"{where} AND {cond}" if where else f"WHERE {cond}", [*params, search]
+
+    @classmethod
+    def query_rows(cls, db: Database, where, params, search, limit, anchor=None):
+        """One keyset batch for a filter; only touches `db`, so it can run on a worker thread."""
+        select, where, params = cls._source(where, params, search)
+        order_columns = [cls.ORDER_EXPRESSIONS.get(c, c) for c in cls._order_columns(search)]
+        if anchor:
+            cols = ", ".join(order_columns)
+            marks = ", ".join("?" for _ in order_columns)
+            seek = f"({cols}) < ({marks})"
+            where = f"{where} AND {seek}" if where else f"WHERE {seek}"
+            params.extend(anchor)
+        order = ", ".join(f"{c} DESC" for c in order_columns)
+        return db.fetchall(f"{select} {where} ORDER BY {order} LIMIT ?", (*params, limit))
+
+    def _query(self, limit, anchor=None):
+        return self.query_rows(self.db, self._where, self._params, self._search, limit, anchor)
+
+    def _fetch_ids(self, ids):
+        select, where, params = self._source(self._where, self._params, self._search)
+        cond = "transactions.id IN (SELECT value FROM json_each(?))"
+        where = f"{where} AND {cond}" if where else f"WHERE {cond}"
+        return self.db.fetchall(f"{select} {where}", (*params, json.dumps(list(ids))))
+
+    def _replace_rows(self, rows):
+        old_ids = [r[0] for r in self._rows]
+        new_ids = [r[0] for r in rows]
+        opcodes = difflib.SequenceMatcher(None, old_ids, new_ids, autojunk=False).get_opcodes()
+        # Walk backwards so earlier positions stay valid while rows move.
+        for tag, i1, i2, j1, j2 in reversed(opcodes):
+            if tag in ("delete", "replace"):
+                self.beginRemoveRows(QModelIndex(), i1, i2 - 1)
+                del self._rows[i1:i2]
+                del self._display[i1:i2]
+                self.endRemoveRows()
+            if tag in ("insert", "replace"):
+                self.beginInsertRows(QModelIndex(), i1, i1 + (j2 - j1) - 1)
+                self._rows[i1:i1] = rows[j1:j2]
+                self._display[i1:i1] = [self._format_row(r) for r in rows[j1:j2]]
+                self.endInsertRows()
+        for i, row in enumerate(rows):
+            if self._rows[i] != row:
+                self._rows[i] = row
+                self._display[i] = self._format_row(row)
+                self.dataChanged.emit(self.index(i, 0), self.index(i, len(self.columns) - 1))
+
+    def _format_row(self, row):
+        rid, date, t, cat, amt, note = row[:6]
+        values = {
+            "id": str(rid), "date": format_date_for_display(date), "type": t.title(),
+            "category": (cat or "").title(), "amount": format_amount(amt, self.db.amount_precision),
+            "note": note.replace(HIGHLIGHT_START, "").replace(HIGHLIGHT_END, ""), "actions": None
+        }
+        return tuple(values[c] for c in self.columns)
+
+    # -=- Row access -=-
+    def transaction_id(self, row: int) -> int:
+        return self._rows[row][0]
+
+    def row_tuple(self, row: int) -> tuple:
+        return self._rows[row]
+
+    def column_name(self, column: int) -> str:
+        return self.columns[column]
+
+class RecentTransactionsModel(TransactionTableModel):
+    """The newest `limit` transactions by id, kept current through apply_changes()."""
+    ORDER_COLUMNS = ("id",)
+
+    def __init__(self, db: Database, columns, limit=10, parent=None):
+        super().__init__(db, columns, batch_size=limit, parent=parent)
+        self.limit = limit
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return False
+
+    def refresh(self):
+        self._exhausted = True
+        self._replace_rows(self._query(self.limit))
+
+    def apply_changes(self, inserted=(), updated=(), deleted=()):
+        self._exhausted = True
+        super().apply_changes(inserted, updated, deleted)
+        if len(self._rows) > self.limit:
+            self._replace_rows(self._rows[:self.limit])
+        elif len(self._rows) < self.limit:
+            anchor = self._sort_key(self._rows[-1]) if self._rows else None
+            backfill = self._query(self.limit - len(self._rows), anchor)
+            self._replace_rows(self._rows + backfill)
+
+class TransactionActionDelegate(QStyledItemDelegate):
+    """Paints edit/delete (or undo + countdown) buttons instead of per-row widgets."""
+    edit_requested = pyqtSignal(int)
+    delete_requested = pyqtSignal(int)
+    undo_requested = pyqtSignal(int)
+
+    TOOLTIPS = {"edit": "Edit", "delete": "Delete", "undo": "Undo Delete"}
+
+    def __init__(self, pending_countdown=None, parent=None):
+        super().__init__(parent)
+        # Callable rid -> seconds left for a pending delete, or None
+        self.pending_countdown = pending_countdown or (lambda rid: None)
+
+    def _buttons(self, rect: QRect, rid):
+        h = min(rect.height() - 6, BUTTON_HEIGHT - 10)
+        y = rect.top() + (rect.height() - h) // 2
+        x = rect.left() + 4
+        if self.pending_countdown(rid) is not None:
+            return [("undo", QRect(x, y, 56, h))]
+        w = min(BUTTON_WIDTH - 8, (rect.width() - 14) // 2)
+        return [("edit", QRect(x, y, w, h)), ("delete", QRect(x + w + 6, y, w, h))]
+
+    def _action_at(self, option, index, pos):
+        rid = index.data(Qt.ItemDataRole.UserRole)
+        for action, r in self._buttons(option.rect, rid):
+            if r.contains(pos):
+                return action, rid
+        return None, rid
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        rid = index.data(Qt.ItemDataRole.UserRole)
+        countdown = self.pending_countdown(rid)
+        text_color = option.palette.color(QPalette.ColorRole.Text)
+        fill = QColor(text_color)
+        fill.setAlpha(60 if option.state & QStyle.StateFlag.State_MouseOver else 30)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        for action, r in self._buttons(option.rect, rid):
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(fill)
+            painter.drawRoundedRect(r, 4, 4)
+            painter.setPen(text_color)
+            label = {"edit": "✏️", "delete": "🗑️", "undo": "Undo"}[action]
+            painter.drawText(r, Qt.AlignmentFlag.AlignCenter, label)
+        if countdown is not None:
+            r = QRect(option.rect.left() + 62, option.rect.top(), 20, option.rect.height())
+            font = painter.font()
+            font.setBold(True)
+            painter.setFont(font)
+            painter.setPen(QColor("red"))
+            painter.drawText(r, Qt.AlignmentFlag.AlignCenter, str(countdown))
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton):
+            action, rid = self._action_at(option, index, event.position().toPoint())
+            if action is not None:
+                {"edit": self.edit_requested, "delete": self.delete_requested,
+                 "undo": self.undo_requested}[action].emit(rid)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QEvent.Type.ToolTip:
+            action, _ = self._action_at(option, index, event.pos())
+            if action is not None:
+                QToolTip.showText(event.globalPos(), self.TOOLTIPS[action], view)
+                return True
+        return super().helpEvent(event, view, option, index)
+
+class HighlightDelegate(QStyledItemDelegate):
+    """Paints the search matches in a note snippet (HIGHLIGHT_ROLE) in bold."""
+    def paint(self, painter, option, index):
+        marked = index.data(HIGHLIGHT_ROLE)
+        if not marked or HIGHLIGHT_START not in marked:
+            return super().paint(painter, option, index)
+        self.initStyleOption(option, index)
+        option.text = ""
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, option, painter, option.widget)
+
+        selected = option.state & QStyle.StateFlag.State_Selected
+        color = option.palette.color(QPalette.ColorRole.HighlightedText if selected else QPalette.ColorRole.Text)
+        text = html.escape(marked).replace(HIGHLIGHT_START, "<b>").replace(HIGHLIGHT_END, "</b>")
+        doc = QTextDocument()
+        doc.setDocumentMargin(0)
+        doc.setDefaultFont(option.font)
+        doc.setHtml(f'<span style="color: {color.name()}; white-space: pre;">{text}</span>')
+        rect = style.subElementRect(QStyle.SubElement.SE_ItemViewItemText, option, option.widget)
+        painter.save()
+        painter.setClipRect(rect)
+        painter.translate(rect.left(), rect.top() + (rect.height() - doc.size().height()) / 2)
+        doc.drawContents(painter)
+        painter.restore()
+
+# --- Change notifications ---
+class ChangeSet:
+    """Transaction ids and dates touched by one or more writes. `full` means the scope is unknown."""
+
+    def __init__(self, inserted=(), updated=(), deleted=(), dates=(), full=False):
+        self.inserted = set(inserted)
+        self.updated = set(updated)
+        self.deleted = set(deleted)
+        self.dates = {d for d in dates if d}
+        self.full = full
+
+    def merge(self, other: "ChangeSet") -> "ChangeSet":
+        self.inserted |= other.inserted
+        self.updated |= other.updated
+        self.deleted |= other.deleted
+        self.dates |= other.dates
+        self.full = self.full or other.full
+        return self
+
+    def touches_range(self, start: str, end: str) -> bool:
+        if self.full or not self.dates:
+            return True
+        return any(start <= d <= end for d in self.dates)
+
+    def __bool__(self):
+        return bool(self.full or self.inserted or self.updated or self.deleted)
+
+    def __repr__(self):
+        return (f"ChangeSet(inserted={len(self.inserted)}, updated={len(self.updated)}, "
+                f"deleted={len(self.deleted)}, dates={len(self.dates)}, full={self.full})")
+
+class InvalidationBus(QObject):
+    """Coalesces change notifications within one event-loop tick and refreshes only
+    visible, affected pages. Hidden pages are refreshed when they are next shown."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = ChangeSet()
+        self._subscribers = {}   # page -> (handler, affected_by)
+        self._stale = {}         # hidden page -> ChangeSet accumulated while hidden
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+        self.refreshes_requested = 0
+        self.refreshes_executed = 0
+
+    def subscribe(self, page: QWidget, handler, affected_by=None):
+        self._subscribers[page] = (handler, affected_by)
+        page.installEventFilter(self)
+
+    def notify(self, changes: ChangeSet):
+        if not changes:
+            return
+        self.refreshes_requested += 1
+        self._pending.merge(changes)
+        self._timer.start()
+
+    def flush(self):
+        changes, self._pending = self._pending, ChangeSet()
+        if not changes:
+            return
+        for page, (handler, affected_by) in self._subscribers.items():
+            if affected_by is not None and not affected_by(changes):
+                continue
+            if page.isVisible():
+                self._run(handler, changes)
+            else:
+                self._stale.setdefault(page, ChangeSet()).merge(changes)
+        logger.debug(f"Flushed {changes}: {self.stats()}")
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Show and obj in self._stale:
+            self._run(self._subscribers[obj][0], self._stale.pop(obj))
+        return False
+
+    def _run(self, handler, changes):
+        self.refreshes_executed += 1
+        handler(changes)
+
+    def stats(self) -> dict:
+        return {
+            "refreshes_requested": self.refreshes_requested,
+            "refreshes_executed": self.refreshes_executed,
+        }
+
 # --- Pages ---
 class MainPage(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, db: Database, parent=None, executor=None):
         super().__init__(parent)
-        self.db_path = "transactions.db"
-        self._stack = None
+        self.db = db
+        self.executor = executor or QueryExecutor(db, self)
+        self._switch_to = None
         self._build_ui()
         self.load_summary()
 
@@ -405,6 +2232,12 @@ class MainPage(QWidget):
         self.welcome_label.setStyleSheet("font-size: 24px; font-weight: bold;")
         layout.addWidget(self.welcome_label)
 
+        self.loading_label = QLabel("")
+        self.loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.loading_label)
+        self.executor.loading_changed.connect(
+            lambda key, busy: key == "main.summary" and self.loading_label.setText("⏳ Updating…" if busy else ""))
+
         # Summary group boxes
         self.gb_last7 = self._make_group_box("Last 7 Days Summary")
         self.gb_month = self._make_group_box("Current Month Balance")
@@ -470,58 +2303,60 @@ class MainPage(QWidget):
         return gb
 
     def load_summary(self):
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
-
-        # Last 7 days
-        last7_start = QDate.currentDate().addDays(-6).toString("yyyy-MM-dd")
-        last7_end = QDate.currentDate().toString("yyyy-MM-dd")
-        cur.execute("""
-            SELECT type, SUM(amount) FROM transactions
-            WHERE date BETWEEN ? AND ?
-            GROUP BY type
-        """, (last7_start, last7_end))
-        last7_data = dict(cur.fetchall())
-        income_7 = last7_data.get("income", 0)
-        expense_7 = last7_data.get("expense", 0)
-        balance_7 = income_7 - expense_7
-        self.gb_last7._income_label.setText(f"Income: ${income_7:.2f}")
-        self.gb_last7._expense_label.setText(f"Expense: ${expense_7:.2f}")
-        self.gb_last7._balance_label.setText(f"Balance: ${balance_7:.2f}")
-
         today = QDate.currentDate()
-        month_start = today.toString("yyyy-MM-01")
-        month_end = today.toString("yyyy-MM-dd")
-        cur.execute("""
-            SELECT type, SUM(amount) FROM transactions
+        ranges = (
+            (today.addDays(-6).toString("yyyy-MM-dd"), today.toString("yyyy-MM-dd")),  # Last 7 days
+            (today.toString("yyyy-MM-01"), today.toString("yyyy-MM-dd")),             # Current month
+        )
+        # Labels keep their previous values until the fresh totals arrive
+        self.executor.submit("main.summary", self._query_summary, ranges, on_result=self._render_summary)
+
+    @staticmethod
+    def _query_summary(db: Database, ranges):
+        return [dict(db.fetchall("""
+            SELECT type, SUM(total) FROM daily_totals
             WHERE date BETWEEN ? AND ?
             GROUP BY type
-        """, (month_start, month_end))
-        month_data = dict(cur.fetchall())
+        """, r)) for r in ranges]
+
+    def _render_summary(self, result):
+        last7_data, month_data = result
+        p = self.db.amount_precision
+        income_7 = last7_data.get("income", 0) or 0
+        expense_7 = last7_data.get("expense", 0) or 0
+        balance_7 = income_7 - expense_7
+        self.gb_last7._income_label.setText(f"Income: ${format_amount(income_7, p)}")
+        self.gb_last7._expense_label.setText(f"Expense: ${format_amount(expense_7, p)}")
+        self.gb_last7._balance_label.setText(f"Balance: ${format_amount(balance_7, p)}")
 
         income_m = month_data.get("income", 0) or 0
         expense_m = month_data.get("expense", 0) or 0
         balance_m = income_m - expense_m
 
-        self.gb_month._income_label.setText(f"Income: ${income_m:.2f}")
-        self.gb_month._expense_label.setText(f"Expense: ${expense_m:.2f}")
-        self.gb_month._balance_label.setText(f"Balance: ${balance_m:.2f}")
+        self.gb_month._income_label.setText(f"Income: ${format_amount(income_m, p)}")
+        self.gb_month._expense_label.setText(f"Expense: ${format_amount(expense_m, p)}")
+        self.gb_month._balance_label.setText(f"Balance: ${format_amount(balance_m, p)}")
 
-        conn.close()
+    def affected_by(self, changes: ChangeSet) -> bool:
+        today = QDate.currentDate()
+        start = min(today.addDays(-6), QDate(today.year(), today.month(), 1))
+        return changes.touches_range(start.toString("yyyy-MM-dd"), today.toString("yyyy-MM-dd"))
+
+    def on_data_changed(self, changes: ChangeSet):
+        self.load_summary()
 
-    def set_page_switcher(self, stack_widget, transactions_page_widget):
-        self._stack = stack_widget
-        self._transactions_page = transactions_page_widget
+    def set_page_switcher(self, switch_to):
+        self._switch_to = switch_to
 
     def _open_manage_transactions(self):
-        self._stack.setCurrentWidget(self._transactions_page)
+        self._switch_to("Manage Transactions")
 
 class TransactionsPage(QWidget):
-    data_changed = pyqtSignal()
-    def __init__(self, main_window = None):
+    data_changed = pyqtSignal(object)
+    def __init__(self, db: Database, main_window = None):
         super().__init__()
+        self.db = db
         self.main_window = main_window
-        self.settings = QSettings("Azralithia", "FinanceTracker")
         layout = QVBoxLayout(self)
 
         # Income/Expense selector
@@ -542,10 +2377,6 @@ class TransactionsPage(QWidget):
         layout.addLayout(self.type_row)
         self.type_button_group.buttonClicked.connect(lambda btn: self.set_type(btn.text()))
 
-        # Categories
-        self.categories = {}
-        self.load_categories()
-
         # Default type = Expense
         self.current_type = "Expense"
         self.expense_btn.setChecked(True)
@@ -568,7 +2399,7 @@ class TransactionsPage(QWidget):
         self.date.setCalendarPopup(True)
         self.date.setDate(QDate.currentDate())
 
-        settings = QSettings("Azralithia", "FinanceTracker")
+        settings = app_settings()
         current_display_format = settings.value("date_format", "(YYYY-MM-DD) | Year-Month-Day")
         display_format = map_display_format(current_display_format)
         self.date.setDisplayFormat(display_format)
@@ -617,125 +2448,66 @@ class TransactionsPage(QWidget):
         recent_label.setStyleSheet("font-weight:600; margin-top:8px;")
         layout.addWidget(recent_label)
 
-        self.recent_table = QTableWidget()
-        self.recent_table.setColumnCount(6)
-        self.recent_table.setHorizontalHeaderLabels(["Date", "Type", "Category", "Amount", "Note", "Actions"])
-        self.recent_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.recent_model = RecentTransactionsModel(
+            self.db, ("date", "type", "category", "amount", "note", "actions"), limit=10, parent=self
+        )
+        self.recent_table = QTableView()
+        self.recent_table.setModel(self.recent_model)
+        self.recent_delegate = TransactionActionDelegate(self._pending_countdown, self.recent_table)
+        self.recent_table.setItemDelegateForColumn(5, self.recent_delegate)
         header = self.recent_table.horizontalHeader()
         for i in range(5):
             header.setSectionResizeMode(i, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(5, QHeaderView.ResizeMode.Fixed)
         self.recent_table.setColumnWidth(5, 100)
-        self.recent_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.recent_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.recent_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.recent_table.setMouseTracking(True)
         layout.addWidget(self.recent_table)
-        self.recent_table.cellClicked.connect(self._handle_recent_table_cell_click)
-    
-    def _handle_recent_table_cell_click(self, row, column):
-            transaction_id_item = self.recent_table.item(row, 0)
-            transaction_id = transaction_id_item.data(Qt.ItemDataRole.UserRole)
-            conn = sqlite3.connect("transactions.db")
-            cur = conn.cursor()
-            cur.execute("SELECT date, type, category, amount, note FROM transactions WHERE id=?", (transaction_id,))
-            data = cur.fetchone()
-            conn.close()
-            if not data:
-                return
-            date, ttype, category, amount, note = data
-            dialog = TransactionEditDialog(transaction_id, "transactions.db", self)
-
-            if column == 0: 
-                dialog.date_edit.setDate(QDate.fromString(date, "yyyy-MM-dd"))
-                dialog.date_edit.setFocus()
-            elif column == 1: 
-                dialog.type_combo.setCurrentText(ttype.title())
-                dialog.type_combo.setFocus()
-            elif column == 2: 
-                dialog.category_combo.setCurrentText(category.title())
-                dialog.category_combo.setFocus()
-            elif column == 3: 
-                dialog.amount_edit.setText(str(amount))
-                dialog.amount_edit.setFocus()
-            elif column == 4: 
-                dialog.note_edit.setText(note)
-                dialog.note_edit.setFocus()
-
-            if dialog.exec():
-                self.load_recent_transactions() 
-                self.data_changed.emit() 
-    
+        self.recent_table.clicked.connect(self._handle_recent_table_cell_click)
+        self.recent_delegate.edit_requested.connect(self._edit_from_preview)
+        self.recent_delegate.delete_requested.connect(self._delete_from_preview)
+        self.recent_delegate.undo_requested.connect(lambda rid: self.main_window and self.main_window.undo_delete(rid))
+
+    def _pending_countdown(self, rid):
+        if self.main_window and rid in self.main_window.pending_delete_transactions:
+            return self.main_window.pending_delete_transactions[rid].get("countdown")
+        return None
+
+    def _handle_recent_table_cell_click(self, index):
+        if not index.isValid() or index.column() == 5:
+            return  # action buttons are handled by the delegate
+        transaction_id = self.recent_model.transaction_id(index.row())
+        dialog = TransactionEditDialog(transaction_id, self.db, self)
+        dialog.focus_field(self.recent_model.column_name(index.column()))
+        if dialog.exec():
+            self.data_changed.emit(dialog.change_set())
+
     def showEvent(self, event):
-            self.load_recent_transactions()
-            super().showEvent(event)
-
-    def load_recent_transactions(self, limit=10):
-        conn = sqlite3.connect("transactions.db")
-        cur = conn.cursor()
-        cur.execute("SELECT id, date, type, category, amount, COALESCE(note,'') FROM transactions ORDER BY id DESC LIMIT ?", (limit,))
-        rows = cur.fetchall()
-        conn.close()
-        self.recent_table.setRowCount(len(rows))
-        for r, (rid, date, t, cat, amt, note) in enumerate(rows):
-            date_item = QTableWidgetItem(format_date_for_display(date))
-            date_item.setData(Qt.ItemDataRole.UserRole, rid)
-            self.recent_table.setItem(r, 0, date_item)
-            self.recent_table.setItem(r, 1, QTableWidgetItem(t.title()))
-            self.recent_table.setItem(r, 2, QTableWidgetItem((cat or "").title()))
-            self.recent_table.setItem(r, 3, QTableWidgetItem(f"{amt:.2f}"))
-            self.recent_table.setItem(r, 4, QTableWidgetItem(note))
-            btns_widget = QWidget()
-            btns_layout = QHBoxLayout(btns_widget)
-            btns_layout.setContentsMargins(0, 0, 0, 0)
-            btns_layout.setSpacing(6)
-            if self.main_window and rid in self.main_window.pending_delete_transactions:
-                entry = self.main_window.pending_delete_transactions[rid]
-                labels_map = entry.setdefault("countdown_labels", {})
-
-                if "recent" in labels_map and labels_map["recent"] is not None:
-                    countdown_label = labels_map["recent"]
-                else:
-                    countdown_label = QLabel(str(entry["countdown"]))
-                    countdown_label.setFixedWidth(20)
-                    countdown_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                    countdown_label.setStyleSheet("font-weight: bold; color: red;")
-                    labels_map["recent"] = countdown_label
-
-                buttons_map = entry.setdefault("undo_buttons", {})
-                undo_btn = QPushButton("Undo")
-                undo_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-                undo_btn.setToolTip("Undo Delete")
-                undo_btn.clicked.connect(lambda _, _rid=rid: self.main_window.undo_delete(_rid))
-                buttons_map["recent"] = undo_btn
-                inline_undo_widget = QWidget()
-                inline_undo_layout = QHBoxLayout(inline_undo_widget)
-                inline_undo_layout.setContentsMargins(0, 0, 0, 0)
-                inline_undo_layout.setSpacing(2)
-                inline_undo_layout.addWidget(undo_btn)
-                inline_undo_layout.addWidget(countdown_label)
-                inline_undo_layout.addStretch()
-                btns_layout.addWidget(inline_undo_widget)
-            else:
-                edit_btn = QPushButton(" ✏️")
-                delete_btn = QPushButton(" 🗑️")
-                edit_btn.setFixedSize(BUTTON_WIDTH, BUTTON_HEIGHT - 10)
-                delete_btn.setFixedSize(BUTTON_WIDTH, BUTTON_HEIGHT - 10)
-                edit_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-                delete_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-                edit_btn.setToolTip("Edit")
-                delete_btn.setToolTip("Delete")
-                edit_btn.clicked.connect(lambda _, _rid=rid: self._edit_from_preview(_rid))
-                delete_btn.clicked.connect(lambda _, _rid=rid, _date=date, _type=t, _cat=cat, _amt=amt, _note=note:
-                    self.main_window.mark_transaction_for_deletion( _rid, (_rid, _date, _type, _cat, _amt, _note))
-                )
-                btns_layout.addWidget(edit_btn)
-                btns_layout.addWidget(delete_btn)
-            btns_layout.addStretch()
-            self.recent_table.setCellWidget(r, 5, btns_widget)
+        self.load_recent_transactions()
+        super().showEvent(event)
+
+    def load_recent_transactions(self):
+        self.recent_model.refresh()
+
+    def on_data_changed(self, changes: ChangeSet):
+        if changes.full:
+            self.recent_model.refresh()
+        else:
+            self.recent_model.apply_changes(changes.inserted, changes.updated, changes.deleted)
+
+    def refresh_actions(self):
+        self.recent_model.refresh_actions()
 
     def _edit_from_preview(self, rid):
-        dlg = TransactionEditDialog(rid, "transactions.db", self)
+        dlg = TransactionEditDialog(rid, self.db, self)
         if dlg.exec():
-            self.load_recent_transactions()
-            self.data_changed.emit()
+            self.data_changed.emit(dlg.change_set())
+
+    def _delete_from_preview(self, rid):
+        row = next((r for r in range(self.recent_model.rowCount()) if self.recent_model.transaction_id(r) == rid), None)
+        if row is not None and self.main_window:
+            self.main_window.mark_transaction_for_deletion(rid, self.recent_model.row_tuple(row))
 
     # -=- Helpers -=-
     def set_type(self, t: str):
@@ -785,76 +2557,60 @@ class TransactionsPage(QWidget):
 
     def reload_categories(self):
         self.category.clear()
-        self.category.addItems(self.categories.get(self.current_type, []))
+        self.category.addItems(category_names(self.db, self.current_type))
 
     def edit_categories(self):
-        current = self.categories.get(self.current_type, [])
+        current = category_names(self.db, self.current_type, by_usage=False)
         dlg = CategoryEditor(current, self)
         if dlg.exec():
             updated = dlg.get_categories()
             cleaned = []
             seen = set()
             for name in (s.strip() for s in updated):
-                if name and name not in seen:
-                    seen.add(name)
+                if name and canonical_label(name) not in seen:
+                    seen.add(canonical_label(name))
                     cleaned.append(name)
-            self.categories[self.current_type] = cleaned or ["Other"]
+            save_category_list(self.db, self.current_type, cleaned or ["Other"])
             self.reload_categories()
-            self.save_categories()  
-
-    def load_categories(self):
-        stored = self.settings.value("categories", None)
-        defaults = {
-            "Income": ["Salary", "Gift", "Bonus", "Other"],
-            "Expense": ["Food", "Rent", "Utilities", "Transport", "Misc"]
-        }
-        if not stored:
-            self.categories = defaults
-            return
-        try:
-            data = json.loads(stored)
-            if not isinstance(data, dict):
-                raise ValueError
-            for key in ("Income", "Expense"):
-                if key not in data or not isinstance(data[key], list) or not data[key]:
-                    data[key] = defaults[key]
-            self.categories = data
-        except Exception:
-            self.categories = defaults
-
-    def save_categories(self):
-        self.settings.setValue("categories", json.dumps(self.categories))
 
     def save_transaction(self):
         try:
-            amount = float(self.amount.text())
-            if amount <= 0:
-                raise ValueError("Amount must be positive.")
+            # The amount is scaled under the write lock, so a precision change
+            # running on a worker cannot rescale the table around it
+            with self.db.transaction(immediate=True):
+                precision = stored_amount_precision(self.db)
+                amount = to_minor_units(self.amount.text(), precision)
+                if amount <= 0:
+                    raise ValueError("Amount must be positive.")
+
+                tx = {
+                    "type": canonical_label(self.current_type),
+                    "amount": amount,
+                    "category": canonical_label(self.category.currentText()),
+                    "date": self.date.date().toString("yyyy-MM-dd"),
+                    "note": self.notes.text().strip()
+                }
+                digest = content_hash(tx['date'], tx['type'], tx['category'], tx['amount'], tx['note'])
+                label = f"Add {tx['type']} of {format_amount(amount, precision)}"
+                with journal_entry(self.db, label) as entry:
+                    rid = self.db.execute("""
+                        INSERT INTO transactions (type, amount, category_id, date, note, content_hash)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, (tx['type'], tx['amount'], category_id(self.db, tx['type'], tx['category']),
+                          tx['date'], tx['note'], digest)).lastrowid
+                    entry.ids.add(rid)
         except ValueError as e:
             self.feedback.setText(f"❌ {e}")
             return
-
-        tx = {
-            "type": self.current_type.lower(),
-            "amount": amount,
-            "category": self.category.currentText().lower(),
-            "date": self.date.date().toString("yyyy-MM-dd"),
-            "note": self.notes.text().strip()
-        }
-        conn = sqlite3.connect("transactions.db")
-        cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO transactions (type, amount, category, date, note)
-            VALUES (?, ?, ?, ?, ?)
-        """, (tx['type'], tx['amount'], tx['category'], tx['date'], tx['note']))
-        conn.commit()
-        conn.close()
+        except sqlite3.OperationalError as e:
+            self.feedback.setText(f"❌ Could not save: {e}")
+            logger.error(f"Saving transaction failed: {e}", exc_info=True)
+            return
         logging.getLogger().info(f"Transaction saved: {tx}")
         self.feedback.setText("✅ Transaction saved!")
         self.amount.clear()
         self.notes.clear()
-        self.data_changed.emit()
-        self.load_recent_transactions()
+        self.data_changed.emit(ChangeSet(inserted=[rid], dates=[tx['date']]))
         QTimer.singleShot(5000, lambda: self.feedback.setText(""))
     
     def apply_theme(self, mode: str):
@@ -864,17 +2620,20 @@ class TransactionsPage(QWidget):
             self.setStyleSheet(LIGHT_MODE)
 
 class SummaryPage(QWidget):
-    def __init__(self, db_path="transactions.db", parent=None):
+    def __init__(self, db: Database, parent=None, executor=None):
         super().__init__(parent)
-        self.db_path = db_path
+        self.db = db
+        self.executor = executor or QueryExecutor(db, self)
+        self._summary_requested = False
         self._build_ui()
 
         self.start_picker.dateChanged.connect(self.refresh_summary)
         self.end_picker.dateChanged.connect(self.refresh_summary)
-        self.refresh_summary()
 
-    def set_db_path(self, db_path: str):
-        self.db_path = db_path
+    def affected_by(self, changes: ChangeSet) -> bool:
+        return changes.touches_range(*self._get_date_range())
+
+    def on_data_changed(self, changes: ChangeSet):
         self.refresh_summary()
 
     def _build_ui(self):
@@ -885,7 +2644,7 @@ class SummaryPage(QWidget):
         header = QHBoxLayout()
         header.setSpacing(12)
 
-        settings = QSettings("Azralithia", "FinanceTracker")
+        settings = app_settings()
         light_mode = settings.value("light_mode", False, type=bool)
         current_display_format = settings.value("date_format", "(YYYY-MM-DD) | Year-Month-Day") 
         display_format = map_display_format(current_display_format)
@@ -908,6 +2667,12 @@ class SummaryPage(QWidget):
         header.addWidget(self.end_label)
         header.addWidget(self.end_picker)
 
+        self.loading_label = QLabel("")
+        self.loading_label.setObjectName("SummaryLabelSmall")
+        header.addWidget(self.loading_label)
+        self.executor.loading_changed.connect(
+            lambda key, busy: key == "summary.range" and self.loading_label.setText("⏳ Loading…" if busy else ""))
+
         self.refresh_btn = QPushButton("Refresh")
         self.refresh_btn.clicked.connect(self.refresh_summary)
 
@@ -933,13 +2698,16 @@ class SummaryPage(QWidget):
         breakdowns_layout.addWidget(self.gb_expense)
 
         # Graph 
-        if MATPLOTLIB_AVAILABLE:
-            self.graph_fig = Figure(figsize=(4,3), tight_layout=True)
-            self.graph_canvas = FigureCanvas(self.graph_fig)
-            outer.addWidget(self.graph_canvas)
-        else:
-            self.graph_placeholder = QLabel("Graph unavailable (matplotlib not installed)")
-            outer.addWidget(self.graph_placeholder)
+        # The canvas is created on first show so matplotlib is not imported at startup
+        self.graph_canvas = None
+        self._graph_theme = None
+        self._theme_mode = "light" if light_mode else "dark"
+        self._pending_series = None
+        self.graph_layout = QVBoxLayout()
+        self.graph_placeholder = QLabel("Loading graph…" if MATPLOTLIB_AVAILABLE else "Graph unavailable (matplotlib not installed)")
+        self.graph_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.graph_layout.addWidget(self.graph_placeholder)
+        outer.addLayout(self.graph_layout)
         outer.addLayout(header)
         outer.addLayout(totals)
         outer.addWidget(self._hline())
@@ -990,153 +2758,226 @@ class SummaryPage(QWidget):
         line.setFrameShadow(QFrame.Shadow.Sunken)
         return line
 
-    def _plot_balance_over_range(self, start_date, end_date):
-        if not MATPLOTLIB_AVAILABLE:
+    @staticmethod
+    def _fetch_balance_rows(db: Database, start_date: str, end_date: str):
+        # Balance carried into the range, then the end-of-day balance of each day in it
+        settle_daily_balance(db)
+        opening = db.fetchone(
+            "SELECT balance FROM daily_balance WHERE date < ? ORDER BY date DESC LIMIT 1", (start_date,))
+        rows = db.fetchall(
+            "SELECT date, balance FROM daily_balance WHERE date >= ? AND date <= ? ORDER BY date",
+            (start_date, end_date))
+        return (opening[0] if opening else 0), rows
+
+    @staticmethod
+    def _balance_series(start_date, end_date, opening, rows, precision):
+        if not rows or not load_matplotlib():
+            return [], [], [], []
+        days = np.arange(np.datetime64(start_date), np.datetime64(end_date) + 1, dtype="datetime64[D]")
+        row_days = np.array([r[0][:10] for r in rows], dtype="datetime64[D]")
+        row_balances = np.array([r[1] for r in rows], dtype=float)
+        # Each day takes the balance of the latest day with transactions at or before it
+        idx = np.searchsorted(row_days, days, side="right") - 1
+        balances = np.where(idx >= 0, row_balances[np.maximum(idx, 0)], opening) / 10 ** precision
+        dates = mdates.date2num(days)
+        return (dates, balances) + downsample_minmax(dates, balances)
+
+    # --=-- Graph --=--
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.graph_canvas is None and load_matplotlib():
+            self._build_graph()
+        if not self._summary_requested:
+            self.refresh_summary()
+
+    def _build_graph(self):
+        self.graph_fig = Figure(figsize=(4,3), tight_layout=True)
+        self.graph_canvas = FigureCanvas(self.graph_fig)
+        self.graph_layout.replaceWidget(self.graph_placeholder, self.graph_canvas)
+        self.graph_placeholder.deleteLater()
+        # Artists are created once; refreshes only swap their data
+        ax = self.graph_ax = self.graph_fig.add_subplot(111)
+        ax.set_title("Balance over Time")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Balance")
+        ax.tick_params(axis='x', labelrotation=30)
+        self.balance_line, = ax.plot([], [])
+        self.no_data_text = ax.text(0.5, 0.5, "No data for selected range", ha='center', va='center',
+                                    transform=ax.transAxes, visible=False)
+        self.hover_marker, = ax.plot([], [], "o", markersize=6, animated=True)
+        self.hover_text = ax.annotate("", xy=(0, 0), xytext=(10, 10), textcoords="offset points",
+                                      animated=True, bbox={"boxstyle": "round", "alpha": 0.85})
+        self._graph_date_format = None
+        self._graph_background = None
+        self._hover_series = ([], [])
+        self.graph_canvas.mpl_connect("draw_event", self._on_graph_draw)
+        self.graph_canvas.mpl_connect("motion_notify_event", self._on_graph_hover)
+        self.graph_canvas.mpl_connect("axes_leave_event", lambda event: self._blit_hover(None))
+        self._apply_graph_theme(self._theme_mode)
+        if self._pending_series is not None:
+            self._plot_balance_over_range(*self._pending_series)
+
+    def _apply_graph_theme(self, mode: str):
+        self._theme_mode = mode
+        if self.graph_canvas is None or mode == self._graph_theme:
             return
-        settings = QSettings("Azralithia", "FinanceTracker")
-        light_mode = settings.value("light_mode", False, type=bool)
-        conn = self._connect()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT date,
-            SUM(CASE WHEN lower(type)='income' THEN amount WHEN lower(type)='expense' THEN -amount ELSE 0 END) as net
-            FROM transactions
-            WHERE date >= ? AND date <= ?
-            GROUP BY date
-            ORDER BY date
-        """, (start_date, end_date))
-        rows = cur.fetchall()
-        conn.close()
-
-        if rows:
-            rows_map = {r[0]: r[1] for r in rows}
-            d0, d1 = datetime.strptime(start_date, "%Y-%m-%d"), datetime.strptime(end_date, "%Y-%m-%d")
-            raw_dates, nets, running = [], [], 0.0
-            cur_date = d0
-            while cur_date <= d1:
-                s = cur_date.strftime("%Y-%m-%d")
-                running += float(rows_map.get(s, 0.0))
-                raw_dates.append(cur_date)
-                nets.append(running)
-                cur_date += timedelta(days=1)
-            dates = mdates.date2num(raw_dates)
-        else:
-            dates, nets = [], []
-
-        self.graph_fig.clf()
-        ax = self.graph_fig.add_subplot(111)
-
-        palette = self.palette()
-        bg_color = palette.color(QPalette.ColorRole.Window).name()
-        text_color = palette.color(QPalette.ColorRole.WindowText).name()
-        line_color = "#1f77b4" if text_color == "#000000" else "#88c0d0"
-        grid_color = "#ccc" if text_color == "#000000" else "#4a4a4a"
-
-        ax.set_facecolor(bg_color)
-        self.graph_fig.set_facecolor(bg_color)
-        ax.tick_params(axis='x', colors=text_color)
-        ax.tick_params(axis='y', colors=text_color)
-        ax.yaxis.label.set_color(text_color)
-        ax.xaxis.label.set_color(text_color)
-        ax.title.set_color(text_color)
+        self._graph_theme = mode
+        colors = GRAPH_THEMES[mode]
+        ax = self.graph_ax
+        self.graph_fig.set_facecolor(colors["background"])
+        ax.set_facecolor(colors["background"])
+        ax.tick_params(colors=colors["text"])
+        for label in (ax.title, ax.xaxis.label, ax.yaxis.label, self.no_data_text):
+            label.set_color(colors["text"])
         for spine in ax.spines.values():
-            spine.set_edgecolor(text_color)
-        ax.grid(True, color=grid_color)
-
-        if len(dates) > 0:
-            ax.plot(dates, nets, color=line_color)
-            ax.set_title("Balance over Time")
-            ax.set_xlabel("Date")
-            ax.set_ylabel("Balance")
-            settings = QSettings("Azralithia", "FinanceTracker")
+            spine.set_edgecolor(colors["text"])
+        ax.grid(True, color=colors["grid"])
+        self.balance_line.set_color(colors["line"])
+        self.hover_marker.set_color(colors["line"])
+        self.hover_text.set_color(colors["text"])
+        self.hover_text.get_bbox_patch().set_facecolor(colors["background"])
+        self.graph_canvas.draw_idle()
+
+    def _plot_balance_over_range(self, start_date, end_date, series):
+        if self.graph_canvas is None:
+            self._pending_series = (start_date, end_date, series)
+            return
+        self._pending_series = None
+        dates, balances, plot_dates, plot_balances = series
+        has_data = len(dates) > 0
+        self._hover_series = (dates, balances)
+
+        self.balance_line.set_data(plot_dates, plot_balances)
+        self.balance_line.set_visible(has_data)
+        self.no_data_text.set_visible(not has_data)
+        ax = self.graph_ax
+        if has_data:
+            settings = app_settings()
             current_display_format = settings.value("date_format", "(YYYY-MM-DD) | Year-Month-Day")
             strftime_format = graph_format(map_display_format(current_display_format))
-            ax.xaxis.set_major_formatter(mdates.DateFormatter(strftime_format))
-            self.graph_fig.autofmt_xdate()
-        else:
-            ax.text(0.5, 0.5, "No data for selected range", ha='center', va='center',
-                    color='white' if not light_mode else 'black')
-
+            if strftime_format != self._graph_date_format:
+                self._graph_date_format = strftime_format
+                ax.xaxis.set_major_formatter(mdates.DateFormatter(strftime_format))
+            ax.relim()
+            ax.autoscale_view()
         self.graph_canvas.draw_idle()
 
+    def _on_graph_draw(self, event):
+        self._graph_background = self.graph_canvas.copy_from_bbox(self.graph_fig.bbox)
+
+    def _on_graph_hover(self, event):
+        dates, balances = self._hover_series
+        if event.inaxes is not self.graph_ax or not len(dates):
+            self._blit_hover(None)
+            return
+        i = min(int(np.searchsorted(dates, event.xdata)), len(dates) - 1)
+        if i and event.xdata - dates[i - 1] < dates[i] - event.xdata:
+            i -= 1
+        self._blit_hover((dates[i], balances[i]))
+
+    def _blit_hover(self, point):
+        # Restore the cached frame and redraw only the hover artists on top of it
+        if self._graph_background is None:
+            return
+        canvas = self.graph_canvas
+        canvas.restore_region(self._graph_background)
+        if point is not None:
+            x, y = point
+            self.hover_marker.set_data([x], [y])
+            self.hover_text.xy = (x, y)
+            day = mdates.num2date(x).strftime(self._graph_date_format or "%Y-%m-%d")
+            self.hover_text.set_text(f"{day}\n{y:.{self.db.amount_precision}f}")
+            self.graph_ax.draw_artist(self.hover_marker)
+            self.graph_ax.draw_artist(self.hover_text)
+        canvas.blit(self.graph_fig.bbox)
+
     # --=-- Data / Queries --=--
     def _get_date_range(self):
         sd = self.start_picker.date().toString("yyyy-MM-dd")
         ed = self.end_picker.date().toString("yyyy-MM-dd")
         return sd, ed
 
-    def _connect(self):
-        if not self.db_path:
-            raise RuntimeError("SummaryPage: db_path not set. Call set_db_path(path_to_sqlite).")
-        return sqlite3.connect(self.db_path)
-
-    def _fetch_totals_and_counts(self, start_date: str, end_date: str):
-        totals = {'income': 0.0, 'expense': 0.0, 'balance': 0.0}
-        counts_income = defaultdict(lambda: {'total': 0.0, 'count': 0})
-        counts_expense = defaultdict(lambda: {'total': 0.0, 'count': 0})
+    @staticmethod
+    def _fetch_totals_and_counts(db: Database, start_date: str, end_date: str):
+        totals = {'income': 0, 'expense': 0, 'balance': 0}
+        counts_income = defaultdict(lambda: {'total': 0, 'count': 0})
+        counts_expense = defaultdict(lambda: {'total': 0, 'count': 0})
 
         query_totals = """
-            SELECT lower(type) AS type, COALESCE(SUM(amount),0) AS total
-            FROM transactions
+            SELECT type, COALESCE(SUM(total),0) AS total
+            FROM daily_totals
             WHERE date >= ? AND date <= ?
-            GROUP BY lower(type)
+            GROUP BY type
         """
         query_counts = """
-            SELECT lower(type) AS type, lower(category) AS category,
-                COALESCE(SUM(amount),0) AS total, COUNT(*) AS count
-            FROM transactions
-            WHERE date >= ? AND date <= ?
-            GROUP BY lower(type), lower(category)
+            SELECT d.type, c.name,
+                COALESCE(SUM(d.total),0) AS total, SUM(d.count) AS count
+            FROM daily_totals AS d LEFT JOIN categories AS c ON c.id = d.category_id
+            WHERE d.date >= ? AND d.date <= ?
+            GROUP BY d.type, d.category_id
             ORDER BY total DESC
         """
         ym = (start_date, end_date)
-        with self._connect() as conn:
-            cur = conn.cursor()
-            # Overall totals
-            for t, total in cur.execute(query_totals, ym):
-                if t.lower() == "income":
-                    totals['income'] = float(total or 0)
-                elif t.lower() == "expense":
-                    totals['expense'] = float(total or 0)
-            totals['balance'] = totals['income'] - totals['expense']
-
-            # Detailed counts per category
-            for t, cat, total_amt, count in cur.execute(query_counts, ym):
-                if (t or "").lower() == "income":
-                    counts_income[cat or "Uncategorized"] = {
-                        'total': float(total_amt or 0),
-                        'count': int(count or 0)
-                    }
-                elif (t or "").lower() == "expense":
-                    counts_expense[cat or "Uncategorized"] = {
-                        'total': float(total_amt or 0),
-                        'count': int(count or 0)
-                    }
+        # Overall totals
+        for t, total in db.execute(query_totals, ym):
+            if t.lower() == "income":
+                totals['income'] = total or 0
+            elif t.lower() == "expense":
+                totals['expense'] = total or 0
+        totals['balance'] = totals['income'] - totals['expense']
+
+        # Detailed counts per category
+        for t, cat, total_amt, count in db.execute(query_counts, ym):
+            if (t or "").lower() == "income":
+                counts_income[cat or "Uncategorized"] = {
+                    'total': total_amt or 0,
+                    'count': int(count or 0)
+                }
+            elif (t or "").lower() == "expense":
+                counts_expense[cat or "Uncategorized"] = {
+                    'total': total_amt or 0,
+                    'count': int(count or 0)
+                }
 
         return totals, counts_income, counts_expense
 
     # ----- Refresh / Render -----
     def refresh_summary(self):
+        # Cards, breakdowns and graph keep showing the previous range until this completes
+        self._summary_requested = True
+        sd, ed = self._get_date_range()
+        self.executor.submit("summary.range", self._query_summary, sd, ed,
+                             on_result=self._render_summary, on_error=self._render_error)
+
+    @classmethod
+    def _query_summary(cls, db: Database, sd: str, ed: str):
+        totals, c_in, c_ex = cls._fetch_totals_and_counts(db, sd, ed)
+        opening, rows = cls._fetch_balance_rows(db, sd, ed)
+        return sd, ed, totals, c_in, c_ex, cls._balance_series(sd, ed, opening, rows, db.amount_precision)
+
+    def _render_summary(self, result):
+        sd, ed, totals, c_in, c_ex, balance_series = result
         try:
-            sd, ed = self._get_date_range()
-            totals, c_in, c_ex = self._fetch_totals_and_counts(sd, ed)
-
-            self.card_income._value_label.setText(f"{totals['income']:.2f}")
-            self.card_expense._value_label.setText(f"{totals['expense']:.2f}")
-            self.card_balance._value_label.setText(f"{totals['balance']:.2f}")
+            p = self.db.amount_precision
+            self.card_income._value_label.setText(format_amount(totals['income'], p))
+            self.card_expense._value_label.setText(format_amount(totals['expense'], p))
+            self.card_balance._value_label.setText(format_amount(totals['balance'], p))
 
             self._render_breakdown(self.gb_income, c_in)
             self._render_breakdown(self.gb_expense, c_ex)
-            self._plot_balance_over_range(sd, ed)
+            self._plot_balance_over_range(sd, ed, balance_series)
 
         except Exception as e:
-            # Show an error in the UI instead of crashing
-            self.card_income._value_label.setText("—")
-            self.card_expense._value_label.setText("—")
-            self.card_balance._value_label.setText("—")
-            self._render_breakdown(self.gb_income, {"Error": {'total': 0.0, 'count': 0}}) 
-            self._render_breakdown(self.gb_expense, {f"Error: {str(e)}": {'total': 0.0, 'count': 0}}) 
-            logger.error(f"Error refreshing summary: {e}", exc_info=True)
+            self._render_error(e)
+
+    def _render_error(self, e: Exception):
+        # Show an error in the UI instead of crashing
+        self.card_income._value_label.setText("—")
+        self.card_expense._value_label.setText("—")
+        self.card_balance._value_label.setText("—")
+        self._render_breakdown(self.gb_income, {"Error": {'total': 0, 'count': 0}})
+        self._render_breakdown(self.gb_expense, {f"Error: {str(e)}": {'total': 0, 'count': 0}})
+        logger.error(f"Error refreshing summary: {e}", exc_info=e)
 
     def _render_breakdown(self, groupbox: QGroupBox, data: dict):
         lay = groupbox._rows_layout
@@ -1155,7 +2996,7 @@ class SummaryPage(QWidget):
             total = info['total']
             count = info['count']
             capitalized_cat = cat.title() if cat else "Uncategorized"
-            row = QLabel(f"{capitalized_cat} ({count}) — {total:.2f}")
+            row = QLabel(f"{capitalized_cat} ({count}) — {format_amount(total, self.db.amount_precision)}")
             row.setObjectName("SummaryRow")
             lay.addWidget(row)
     
@@ -1164,20 +3005,27 @@ class SummaryPage(QWidget):
             self.setStyleSheet(DARK_MODE)
         else:
             self.setStyleSheet(LIGHT_MODE)
-        self.refresh_summary()
+        self._apply_graph_theme(mode)
 
 class HistoryPage(QWidget):
-    data_changed = pyqtSignal()
-    def __init__(self, db_path="transactions.db", parent=None, main_window = None):
+    data_changed = pyqtSignal(object)
+    def __init__(self, db: Database, parent=None, main_window = None, executor=None):
         super().__init__(parent)
-        self.db_path = db_path
+        self.db = db
+        self.executor = executor or QueryExecutor(db, self)
         self.main_window = main_window
-        self.page_size = 10
-        self.current_page = 0
         self.total_rows = 0
+        self._count_key = None
+        # (where, params, search) -> {"rows": first batch, "total": count}; cleared on any data change
+        self._results = OrderedDict()
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._filter_timer.timeout.connect(self.load_page)
         self._build_ui()
-        self.load_page()
-        settings = QSettings("Azralithia", "FinanceTracker")
+        self.executor.loading_changed.connect(
+            lambda key, busy: key in ("history.count", "history.page") and self._update_status_label())
+        settings = app_settings()
         save = settings.value("save_filters", False, type=bool)
         if save:
             raw = settings.value("history_filters", None)
@@ -1198,7 +3046,6 @@ class HistoryPage(QWidget):
                 self.end_date.setDate(QDate.fromString(data.get("end", QDate.currentDate().toString("yyyy-MM-dd")), "yyyy-MM-dd"))
                 self.note_search.setText(data.get("note", ""))
         self._load_category_filter()
-        self.update_page_size_from_viewport()
         self.load_page()
 
     # ---------- UI ----------
@@ -1209,11 +3056,11 @@ class HistoryPage(QWidget):
         self.type_filter = QComboBox()
         self.type_filter.addItems(["All", "Income", "Expense"])
         self.type_filter.currentIndexChanged.connect(self._load_category_filter)
-        self.type_filter.currentIndexChanged.connect(self._apply_filters)
+        self.type_filter.currentIndexChanged.connect(self._schedule_filters)
         self.category_filter = QComboBox()
         self.category_filter.addItem("All")
 
-        settings = QSettings("Azralithia", "FinanceTracker")
+        settings = app_settings()
         current_display_format = settings.value("date_format", "(YYYY-MM-DD) | Year-Month-Day")
         display_format = map_display_format(current_display_format)
         
@@ -1242,12 +3089,16 @@ class HistoryPage(QWidget):
         fr.addStretch()
         root.addLayout(fr)
 
-        # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(
-            ["ID", "Date", "Type", "Category", "Amount", "Note", "Actions"]
+        # Table: rows are fetched in batches as the view scrolls
+        self.model = TransactionTableModel(
+            self.db, ("id", "date", "type", "category", "amount", "note", "actions"), parent=self
         )
+        self.model.rows_fetched.connect(self._update_status_label)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.action_delegate = TransactionActionDelegate(self._pending_countdown, self.table)
+        self.table.setItemDelegateForColumn(6, self.action_delegate)
+        self.table.setItemDelegateForColumn(5, HighlightDelegate(self.table))
         self.table.horizontalHeader().setStretchLastSection(False)
         header = self.table.horizontalHeader()
         for i in range(6):
@@ -1255,85 +3106,160 @@ class HistoryPage(QWidget):
         header.setSectionResizeMode(6, QHeaderView.ResizeMode.Fixed)
         self.table.setColumnWidth(6, 100)
         self.table.verticalHeader().setDefaultSectionSize(36)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
         self.table.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.table.cellClicked.connect(self._handle_cell_click)
+        self.table.setMouseTracking(True)
+        self.table.clicked.connect(self._handle_cell_click)
         root.addWidget(self.table)
 
-        # Pager
+        # Bulk actions on the selected rows + status
         pr = QHBoxLayout()
-        self.prev_btn = QPushButton("⬅️")
-        self.next_btn = QPushButton("➡️")
-        for b in (self.prev_btn, self.next_btn):
-            b.setFixedSize(BUTTON_WIDTH, BUTTON_HEIGHT)
-            b.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.prev_btn.setToolTip("Previous 10")
-        self.next_btn.setToolTip("Next 10")
-        self.page_label = QLabel("Page 1 / 1")
-
+        self.select_all_btn = QPushButton("Select All")
+        self.bulk_delete_btn = QPushButton("Delete Selected")
+        self.bulk_category_btn = QPushButton("Change Category…")
+        self.bulk_shift_btn = QPushButton("Shift Dates…")
+        self.undo_btn = QPushButton("Undo")
+        self.redo_btn = QPushButton("Redo")
+        self.selection_label = QLabel("")
+        for w in (self.select_all_btn, self.bulk_delete_btn, self.bulk_category_btn, self.bulk_shift_btn,
+                  self.selection_label):
+            pr.addWidget(w)
+        self.page_label = QLabel("Showing 0 of 0")
         pr.addStretch()
-        pr.addWidget(self.prev_btn)
-        pr.addWidget(self.next_btn)
         pr.addWidget(self.page_label)
+        pr.addWidget(self.undo_btn)
+        pr.addWidget(self.redo_btn)
         root.addLayout(pr)
+        self._update_bulk_actions()
+        self._update_undo_buttons()
 
         # Hooks
         self.apply_btn.clicked.connect(self._apply_filters)
         self.reset_btn.clicked.connect(self._reset_filters)
-        self.prev_btn.clicked.connect(self._prev_page)
-        self.next_btn.clicked.connect(self._next_page)
-        
-    def _handle_cell_click(self, row, column):
-        transaction_id_item = self.table.item(row, 0)
-        if not transaction_id_item:
+        self.category_filter.currentIndexChanged.connect(self._schedule_filters)
+        self.start_date.dateChanged.connect(self._schedule_filters)
+        self.end_date.dateChanged.connect(self._schedule_filters)
+        self.note_search.textChanged.connect(self._schedule_filters)
+        self.note_search.returnPressed.connect(self._apply_filters)
+        self.action_delegate.edit_requested.connect(self.edit_transaction)
+        self.action_delegate.delete_requested.connect(self._delete_transaction)
+        self.action_delegate.undo_requested.connect(self._undo_delete)
+        self.table.selectionModel().selectionChanged.connect(self._update_bulk_actions)
+        self.model.modelReset.connect(self._update_bulk_actions)
+        self.model.rowsRemoved.connect(self._update_bulk_actions)
+        self.select_all_btn.clicked.connect(self._select_all)
+        self.bulk_delete_btn.clicked.connect(self._bulk_delete)
+        self.bulk_category_btn.clicked.connect(self._bulk_recategorize)
+        self.bulk_shift_btn.clicked.connect(self._bulk_shift_dates)
+        self.undo_btn.clicked.connect(lambda: self.main_window and self.main_window.undo_last())
+        self.redo_btn.clicked.connect(lambda: self.main_window and self.main_window.redo_last())
+
+    def _pending_countdown(self, rid):
+        if self.main_window and rid in self.main_window.pending_delete_transactions:
+            return self.main_window.pending_delete_transactions[rid].get("countdown")
+        return None
+
+    # ---------- Bulk actions ----------
+    def _selected_rows(self) -> list:
+        return [self.model.row_tuple(index.row()) for index in self.table.selectionModel().selectedRows()]
+
+    def _update_bulk_actions(self, *_):
+        count = len(self.table.selectionModel().selectedRows())
+        text = f"{count} selected" if count else ""
+        if count and count == self.model.rowCount() and self.model.canFetchMore():
+            text += f" (more of the {self.total_rows} matching are not loaded)"
+        self.selection_label.setText(text)
+        for btn in (self.bulk_delete_btn, self.bulk_category_btn, self.bulk_shift_btn):
+            btn.setEnabled(count > 0)
+
+    def _select_all(self):
+        # Selecting only what has scrolled into view would make bulk edits depend on scrolling
+        self.model.fetch_up_to(BULK_SELECT_LIMIT)
+        self.table.selectAll()
+        self._update_status_label()
+        if self.model.canFetchMore():
+            QMessageBox.warning(
+                self, "Select All",
+                f"Only the first {self.model.rowCount()} of the {self.total_rows} matching transactions "
+                "were selected, and bulk actions apply to those alone.\n\nNarrow the filters to reach the rest."
+            )
+
+    def _update_undo_buttons(self):
+        undo, redo = journal_labels(self.db)
+        for btn, verb, label in ((self.undo_btn, "Undo", undo), (self.redo_btn, "Redo", redo)):
+            btn.setEnabled(label is not None)
+            btn.setToolTip(f"{verb}: {label}" if label else f"Nothing to {verb.lower()}")
+
+    def _bulk_delete(self):
+        rows = self._selected_rows()
+        if rows and self.main_window:
+            self.main_window.delete_transactions(rows)
+
+    def _bulk_recategorize(self):
+        rows = self._selected_rows()
+        if not rows:
             return
-        
-        transaction_id = int(transaction_id_item.text())
-        
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
-        cur.execute("SELECT date, type, category, amount, note FROM transactions WHERE id=?", (transaction_id,))
-        data = cur.fetchone()
-        conn.close()
-        if not data:
-            return 
-        date, ttype, category, amount, note = data
-        dialog = TransactionEditDialog(transaction_id, self.db_path, self)
-
-        # If the user clicks on data from the table, opens up Editing focus on that data
-        if column == 1: 
-            dialog.date_edit.setDate(QDate.fromString(date, "yyyy-MM-dd"))
-            dialog.date_edit.setFocus()
-        elif column == 2: 
-            dialog.type_combo.setCurrentText(ttype.title())
-            dialog.type_combo.setFocus()
-        elif column == 3: 
-            dialog.category_edit.setText(category)
-            dialog.category_edit.setFocus()
-        elif column == 4: 
-            dialog.amount_edit.setText(str(amount))
-            dialog.amount_edit.setFocus()
-        elif column == 5: 
-            dialog.note_edit.setText(note)
-            dialog.note_edit.setFocus()
-        else: 
-            pass
+        types = {row[2] for row in rows}
+        if len(types) > 1:
+            # A category belongs to one type; a shared name would be created under both
+            QMessageBox.warning(self, "Change Category",
+                                "The selection mixes income and expenses. Select transactions of one type.")
+            return
+        names = category_names(self.db, types.pop())
+        name, ok = QInputDialog.getItem(self, "Change Category", f"Category for {len(rows)} transaction(s):",
+                                        names, 0, True)
+        if not ok or not name.strip():
+            return
+        self._run_bulk_edit(recategorize_transactions, [row[0] for row in rows], name)
+
+    def _bulk_shift_dates(self):
+        rows = self._selected_rows()
+        if not rows:
+            return
+        days, ok = QInputDialog.getInt(self, "Shift Dates", f"Days to move {len(rows)} transaction(s) by:",
+                                       0, -36500, 36500)
+        if not ok or not days:
+            return
+        self._run_bulk_edit(shift_transaction_dates, [row[0] for row in rows], days)
+
+    def _run_bulk_edit(self, edit, ids, value):
+        try:
+            before, after = edit(self.db, ids, value)
+        except Exception as e:
+            logger.error(f"Bulk {edit.__name__} of {len(ids)} transactions failed: {e}", exc_info=True)
+            QMessageBox.critical(self, "Update Error", f"An error occurred: {e}")
+            return
+        logger.info(f"Bulk {edit.__name__} ({value!r}) changed {len(after)} transaction(s)")
+        self.data_changed.emit(ChangeSet(updated=[row[0] for row in after],
+                                         dates=[row[1] for row in before] + [row[1] for row in after]))
+
+    def _delete_transaction(self, rid: int):
+        row = next((r for r in range(self.model.rowCount()) if self.model.transaction_id(r) == rid), None)
+        if row is not None and self.main_window:
+            self.main_window.mark_transaction_for_deletion(rid, self.model.row_tuple(row))
+
+    def _undo_delete(self, rid: int):
+        if self.main_window:
+            self.main_window.undo_delete(rid)
+
+    def refresh_actions(self):
+        self.model.refresh_actions()
+
+    def _handle_cell_click(self, index):
+        row, column = index.row(), index.column()
+        if not index.isValid() or column == 6:
+            return  # action buttons are handled by the delegate
+        if QApplication.keyboardModifiers() & (Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier):
+            return  # extending the selection, not opening a row
+        transaction_id = self.model.transaction_id(row)
+        dialog = TransactionEditDialog(transaction_id, self.db, self)
+        # Clicking a cell opens the editor focused on that field
+        dialog.focus_field(self.model.column_name(column))
         if dialog.exec():
-            self.load_page()
-            self.data_changed.emit()
-
-    def update_page_size_from_viewport(self):
-        row_h = self.table.verticalHeader().defaultSectionSize() or 36
-        viewport_h = self.table.viewport().height()
-        if viewport_h <= 0:
-            return False  
-        new_page_size = max(1, viewport_h // row_h)
-        if new_page_size != self.page_size:
-            self.page_size = int(new_page_size)
-            self.current_page = max(0, min(self.current_page, max(0, (self.total_rows - 1) // self.page_size)))
-            return True
-        return False
+            self.data_changed.emit(dialog.change_set())
 
     # ---------- Filters & Paging ----------
     def _reset_filters(self):
@@ -1342,36 +3268,33 @@ class HistoryPage(QWidget):
         self.start_date.setDate(QDate.currentDate().addMonths(-1))
         self.end_date.setDate(QDate.currentDate())
         self.note_search.clear()
-        self.current_page = 0
         self.load_page()
 
     def _apply_filters(self):
-        self.current_page = 0
         self.load_page()
 
-    def _prev_page(self):
-        if self.current_page > 0:
-            self.current_page -= 1
-            self.load_page()
+    def _schedule_filters(self, *_):
+        # Typing restarts the timer, so only the last edit in a burst queries
+        self._filter_timer.start()
 
-    def _next_page(self):
-        max_page = max(0, (self.total_rows - 1) // self.page_size)
-        if self.current_page < max_page:
-            self.current_page += 1
-            self.load_page()
+    def invalidate(self):
+        # Data changed: recount on the next load and forget cached results.
+        self._count_key = None
+        self._results.clear()
 
     def _build_where_and_params(self):
+        """WHERE clause and params for the filters, plus the notes FTS query ('' when searching by LIKE or not at all)."""
         conds, params = [], []
 
         t = self.type_filter.currentText()
         if t != "All":
-            conds.append("lower(type) = ?")
-            params.append(t.lower())
+            conds.append("type = ?")
+            params.append(canonical_label(t))
 
         c = self.category_filter.currentText()
         if c != "All":
-            conds.append("lower(category) = ?")
-            params.append(c.lower())
+            conds.append("category_id IN (SELECT id FROM categories WHERE name = ?)")
+            params.append(canonical_label(c))
 
         sd = self.start_date.date().toString("yyyy-MM-dd")
         ed = self.end_date.date().toString("yyyy-MM-dd")
@@ -1383,36 +3306,17 @@ class HistoryPage(QWidget):
             params.append(ed)
 
         q = self.note_search.text().strip()
-        if q:
+        search = notes_match_query(q) if q and has_notes_index(self.db) else ""
+        if q and not search:
             conds.append("note LIKE ?")
             params.append(f"%{q}%")
 
         where = ("WHERE " + " AND ".join(conds)) if conds else ""
-        return where, params
+        return where, params, search
 
     def _load_category_filter(self):
-        settings = QSettings("Azralithia", "FinanceTracker")
-        stored = settings.value("categories", None)
-        defaults = {
-            "Income": ["Salary", "Gift", "Bonus", "Other"],
-            "Expense": ["Food", "Rent", "Utilities", "Transport", "Misc"]
-        }
-        try:
-            cats_map = json.loads(stored) if stored else defaults
-        except Exception:
-            cats_map = defaults
-
         t = self.type_filter.currentText()
-        items = []
-        if t == "All":
-            seen = set()
-            for lst in cats_map.values():
-                for c in lst:
-                    if c and c.lower() not in seen:
-                        seen.add(c.lower())
-                        items.append(c.title())
-        else:
-            items = [c.title() for c in cats_map.get(t, [])]
+        items = category_names(self.db, None if t == "All" else t)
 
         self.category_filter.blockSignals(True)
         current = self.category_filter.currentText()
@@ -1425,96 +3329,92 @@ class HistoryPage(QWidget):
             self.category_filter.setCurrentIndex(idx)
         self.category_filter.blockSignals(False)
 
+    def on_data_changed(self, changes: ChangeSet):
+        self._load_category_filter()
+        self._update_undo_buttons()
+        self.invalidate()
+        if changes.full or self.executor.is_loading("history.page"):
+            # A page still loading may have been read before this change
+            self.load_page()
+            return
+        where, params, search = self._build_where_and_params()
+        self._refresh_count(where, params, search)
+        self.model.apply_changes(changes.inserted, changes.updated, changes.deleted)
+        self._update_status_label()
+
+    def _refresh_count(self, where, params, search=""):
+        count_key = (where, tuple(params), search)
+        cached = self._results.get(count_key, {}).get("total")
+        if cached is not None:
+            self.executor.cancel("history.count")
+            self._set_total(count_key, cached)
+        elif count_key != self._count_key:
+            self.executor.submit("history.count", self._count_rows, where, params, search,
+                                 on_result=lambda total: self._set_total(count_key, total))
+        return count_key
+
+    @staticmethod
+    def _count_rows(db: Database, where, params, search=""):
+        if search:
+            cond = "transactions_fts MATCH ?"
+            where = f"{where} AND {cond}" if where else f"WHERE {cond}"
+            return db.fetchone(f"SELECT COUNT(*) FROM {NOTES_MATCH_JOIN} {where}", [*params, search])[0]
+        return db.fetchone(f"SELECT COUNT(*) FROM transactions {where}", params)[0]
+
+    def _set_total(self, count_key, total):
+        self.total_rows = total
+        self._count_key = count_key
+        self._cache_result(count_key, total=total)
+        self._update_status_label()
+
+    def _cache_result(self, key, **values):
+        self._results.setdefault(key, {"rows": None, "total": None}).update(values)
+        self._results.move_to_end(key)
+        while len(self._results) > FILTER_CACHE_SIZE:
+            self._results.popitem(last=False)
+
     def load_page(self):
-        where, params = self._build_where_and_params()
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
-        cur.execute(f"SELECT COUNT(*) FROM transactions {where}", params)
-        self.total_rows = cur.fetchone()[0]
-        limit = self.page_size
-        offset = self.current_page * self.page_size
-        cur.execute(
-            f"""SELECT id, date, type, category, amount, COALESCE(note,'')
-                FROM transactions
-                {where}
-                ORDER BY date DESC, id DESC
-                LIMIT ? OFFSET ?""",
-            (*params, limit, offset),
-        )
-        rows = cur.fetchall()
-        conn.close()
-        self.table.setRowCount(len(rows))
-        for r, (rid, date, t, cat, amt, note) in enumerate(rows):
-            self.table.setItem(r, 0, QTableWidgetItem(str(rid)))
-            self.table.setItem(r, 1, QTableWidgetItem(format_date_for_display(date)))
-            self.table.setItem(r, 2, QTableWidgetItem(t.title()))
-            self.table.setItem(r, 3, QTableWidgetItem((cat or "").title()))
-            self.table.setItem(r, 4, QTableWidgetItem(f"{amt:.2f}"))
-            self.table.setItem(r, 5, QTableWidgetItem(note))
-
-            btns_widget = QWidget()
-            btns_layout = QHBoxLayout(btns_widget)
-            btns_layout.setContentsMargins(0, 0, 0, 0)
-            btns_layout.setSpacing(6)
-            if self.main_window and rid in self.main_window.pending_delete_transactions:
-                entry = self.main_window.pending_delete_transactions[rid]
-                labels_map = entry.setdefault("countdown_labels", {})
-
-                if "history" in labels_map and labels_map["history"] is not None:
-                    countdown_label = labels_map["history"]
-                else:
-                    countdown_label = QLabel(str(entry["countdown"]))
-                    countdown_label.setFixedWidth(20)
-                    countdown_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                    countdown_label.setStyleSheet("font-weight: bold; color: red;")
-                    labels_map["history"] = countdown_label
-
-                buttons_map = entry.setdefault("undo_buttons", {})
-                undo_btn = QPushButton("Undo")
-                undo_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-                undo_btn.setToolTip("Undo Delete")
-                undo_btn.clicked.connect(lambda _, _rid=rid: self.main_window.undo_delete(_rid))
-                buttons_map["history"] = undo_btn
-                inline_undo_widget = QWidget()
-                inline_undo_layout = QHBoxLayout(inline_undo_widget)
-                inline_undo_layout.setContentsMargins(0, 0, 0, 0)
-                inline_undo_layout.setSpacing(2)
-                inline_undo_layout.addWidget(undo_btn)
-                inline_undo_layout.addWidget(countdown_label)
-                inline_undo_layout.addStretch()
-                btns_layout.addWidget(inline_undo_widget)
-            else:
-                edit_btn = QPushButton(" ✏️")
-                delete_btn = QPushButton(" 🗑️")
-                for b, tip in ((edit_btn, "Edit"), (delete_btn, "Delete")):
-                    b.setFixedSize(BUTTON_WIDTH, BUTTON_HEIGHT)
-                    b.setCursor(Qt.CursorShape.PointingHandCursor)
-                    b.setToolTip(tip)
-                edit_btn.clicked.connect(lambda _, _rid=rid: self.edit_transaction(_rid))
-                delete_btn.clicked.connect(lambda _, _rid=rid, _date=date, _type=t, _cat=cat, _amt=amt, _note=note:
-                    self.main_window.mark_transaction_for_deletion(_rid, (_rid, _date, _type, _cat, _amt, _note))
-                )
-                btns_layout.addWidget(edit_btn)
-                btns_layout.addWidget(delete_btn)
-
-            btns_layout.addStretch()
-            self.table.setCellWidget(r, 6, btns_widget)
-            self.table.setRowHeight(r, self.table.verticalHeader().defaultSectionSize())
-        max_page = max(0, (self.total_rows - 1) // self.page_size)
-        self.page_label.setText(f"Page {self.current_page + 1} / {max_page + 1 if self.total_rows else 1}")
-        self.prev_btn.setEnabled(self.current_page > 0)
-        self.next_btn.setEnabled(self.current_page < max_page)
+        self._filter_timer.stop()
+        where, params, search = self._build_where_and_params()
+        key = self._refresh_count(where, params, search)
+        cached = self._results.get(key, {}).get("rows")
+        if key == self.model.filter_key():
+            self.executor.cancel("history.page")
+            self.model.refresh()
+        elif cached is not None:
+            self.executor.cancel("history.page")
+            self._show_page(key, cached)
+        else:
+            # Submitting supersedes (and interrupts) the query for the previous filter
+            self.executor.submit("history.page", TransactionTableModel.query_rows, where, params, search,
+                                 self.model.batch_size, on_result=lambda rows: self._show_page(key, rows))
+        self._update_status_label()
+
+    def _show_page(self, key, rows):
+        where, params, search = key
+        self._cache_result(key, rows=rows)
+        self.model.set_filter(where, params, search, rows=rows)
+        self.table.scrollToTop()
+        self._update_status_label()
+
+    def _update_status_label(self, *_):
+        if self.executor.is_loading("history.page"):
+            status = " (searching…)"
+        elif self.executor.is_loading("history.count"):
+            status = " (counting…)"
+        else:
+            status = ""
+        self.page_label.setText(f"Showing {self.model.rowCount()} of {self.total_rows}{status}")
 
     def edit_transaction(self, transaction_id: int):
-        dialog = TransactionEditDialog(transaction_id, self.db_path, self)
+        dialog = TransactionEditDialog(transaction_id, self.db, self)
         if dialog.exec():
-            self.load_page()
-            self.data_changed.emit()
+            self.data_changed.emit(dialog.change_set())
 
 class SettingsPage(QWidget):
     def __init__(self):
         super().__init__()
-        self.settings = QSettings("Azralithia", "FinanceTracker")
+        self.settings = app_settings()
         self._build_ui()
         self._load_settings()
     
@@ -1541,6 +3441,12 @@ class SettingsPage(QWidget):
         ])
         self._create_setting_row("Date Format:", self.date_format_combo)
         self.date_format_combo.currentTextChanged.connect(lambda v: self.settings.setValue("date_format", v))
+        # Stored with the data rather than in QSettings; MainWindow applies changes
+        self.amount_precision_combo = QComboBox()
+        for places in range(5):
+            sample = format_amount(123456 // 10 ** (4 - places), places)
+            self.amount_precision_combo.addItem(f"{places} | e.g. {sample}", places)
+        self._create_setting_row("Currency Decimal Places:", self.amount_precision_combo)
         self.save_filters_switch = self._create_toggle_setting("Save Filters on Exit:", "save_filters", False)
         self.remember_export_filters_switch = self._create_toggle_setting("Remember Export Filters:", "remember_export_filters", False)
         self.confirm_delete_switch = self._create_toggle_setting("Confirm Delete Transactions:", "confirm_delete", True)
@@ -1631,13 +3537,14 @@ class SettingsPage(QWidget):
    
 # --- Functionality ---
 class TransactionEditDialog(QDialog):
-    def __init__(self, transaction_id, db_path, parent=None):
+    def __init__(self, transaction_id, db: Database, parent=None):
         super().__init__(parent)
-        self.db_path = db_path
+        self.db = db
         self.transaction_id = transaction_id
+        self._loaded_date = None
         self.setWindowTitle("Edit Transaction")
         self.resize(400, 220)
-        self.settings = QSettings("Azralithia", "FinanceTracker")
+        self.settings = app_settings()
 
         self._build_ui()
         self.load_data()
@@ -1679,36 +3586,30 @@ class TransactionEditDialog(QDialog):
         layout.addRow(btn_box)
 
     def _load_categories_for_type(self):
-        selected_type = self.type_combo.currentText()
-        stored = self.settings.value("categories", None)
-        defaults = {
-            "Income": ["Salary", "Gift", "Bonus", "Other"],
-            "Expense": ["Food", "Rent", "Utilities", "Transport", "Misc"]
-        }
-        try:
-            cats_map = json.loads(stored) if stored else defaults
-        except Exception:
-            cats_map = defaults
-
-        categories = cats_map.get(selected_type, [])
+        categories = category_names(self.db, self.type_combo.currentText())
         self.category_combo.blockSignals(True)
         self.category_combo.clear()
-        self.category_combo.addItems([cat.title() for cat in categories])
+        self.category_combo.addItems(categories)
         self.category_combo.blockSignals(False)
 
+    def focus_field(self, field: str):
+        widget = {
+            "date": self.date_edit, "type": self.type_combo, "category": self.category_combo,
+            "amount": self.amount_edit, "note": self.note_edit
+        }.get(field)
+        if widget is not None:
+            widget.setFocus()
+
     def load_data(self):
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT date, type, category, amount, note FROM transactions WHERE id=?",
+        row = self.db.fetchone(
+            f"SELECT date, type, {CATEGORY_NAME}, amount, note FROM transactions WHERE id=?",
             (self.transaction_id,)
         )
-        row = cur.fetchone()
-        conn.close()
         if not row:
             return
 
         date, ttype, category, amount, note = row
+        self._loaded_date = date
         self.date_edit.setDate(QDate.fromString(date, "yyyy-MM-dd"))
         self.type_combo.setCurrentText(ttype.title())
         self._load_categories_for_type()
@@ -1722,37 +3623,48 @@ class TransactionEditDialog(QDialog):
                 self.category_combo.addItem("Other")
             self.category_combo.setCurrentText(fallback)
 
-        self.amount_edit.setText(str(amount))
+        self.amount_edit.setText(format_amount(amount, self.db.amount_precision))
         self.note_edit.setText(note or "")
 
+    def change_set(self) -> ChangeSet:
+        new_date = self.date_edit.date().toString("yyyy-MM-dd")
+        return ChangeSet(updated=[self.transaction_id], dates=[self._loaded_date, new_date])
+
     def save_changes(self):
         date = self.date_edit.date().toString("yyyy-MM-dd")
-        ttype = self.type_combo.currentText().lower()
-        category = self.category_combo.currentText().lower()
+        ttype = canonical_label(self.type_combo.currentText())
+        category = canonical_label(self.category_combo.currentText())
+
+        note = self.note_edit.text()
 
         try:
-            amount = float(self.amount_edit.text())
+            # Scaled under the write lock, as in TransactionsPage.save_transaction
+            with self.db.transaction(immediate=True):
+                amount = to_minor_units(self.amount_edit.text(), stored_amount_precision(self.db))
+                digest = content_hash(date, ttype, category, amount, note)
+                with journal_entry(self.db, f"Edit transaction {self.transaction_id}", [self.transaction_id]):
+                    self.db.execute(
+                        "UPDATE transactions SET date=?, type=?, category_id=?, amount=?, note=?, content_hash=? WHERE id=?",
+                        (date, ttype, category_id(self.db, ttype, category), amount, note, digest, self.transaction_id),
+                    )
         except ValueError:
             QMessageBox.warning(self, "Invalid Input", "Amount must be a number.")
             return
-
-        note = self.note_edit.text()
-
-        conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
-        cur.execute(
-            "UPDATE transactions SET date=?, type=?, category=?, amount=?, note=? WHERE id=?",
-            (date, ttype, category, amount, note, self.transaction_id),
-        )
-        conn.commit()
-        conn.close()
+        except sqlite3.OperationalError as e:
+            QMessageBox.critical(self, "Save Error", f"Failed to save changes: {e}")
+            logger.error(f"Saving transaction {self.transaction_id} failed: {e}", exc_info=True)
+            return
         self.accept()
 
 class ExportOptionsDialog(QDialog):
-    def __init__(self, db_path, parent=None):
+    HEADERS = ["Date", "Type", "Category", "Amount", "Note"]
+    FORMATS = {"CSV": "csv", "Excel (XLSX)": "xlsx", "JSON": "json", "JSON Lines": "jsonl"}
+
+    def __init__(self, db: Database, parent=None, executor=None):
         super().__init__(parent)
-        self.db_path = db_path
-        self.settings = QSettings("Azralithia", "FinanceTracker")
+        self.db = db
+        self.executor = executor or QueryExecutor(db, self)
+        self.settings = app_settings()
         self.current_filters = {}
         self.filter_scope = "full"
 
@@ -1788,13 +3700,19 @@ class ExportOptionsDialog(QDialog):
         format_group = QGroupBox("Export Format")
         format_layout = QHBoxLayout(format_group)
         self.format_combo = QComboBox()
-        self.format_combo.addItems(["CSV", "Excel (XLSX)", "JSON"])
+        self.format_combo.addItems(list(self.FORMATS))
         format_layout.addWidget(self.format_combo)
         format_layout.addStretch()
         main_layout.addWidget(format_group)
 
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFormat("%v / %m rows")
+        self.progress_bar.hide()
+        main_layout.addWidget(self.progress_bar)
+
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
-        button_box.button(QDialogButtonBox.StandardButton.Ok).setText("Export")
+        self.export_btn = button_box.button(QDialogButtonBox.StandardButton.Ok)
+        self.export_btn.setText("Export")
         main_layout.addWidget(button_box)
 
         self.full_db_radio.toggled.connect(self._toggle_filter_scope)
@@ -1848,14 +3766,14 @@ class ExportOptionsDialog(QDialog):
         )
 
     def _open_filter_editor(self):
-        dialog = ExportFilterDialog(self.current_filters, self.db_path, self)
+        dialog = ExportFilterDialog(self.current_filters, self.db, self)
         if dialog.exec():
             self.current_filters = dialog.get_filters()
             self._update_filter_summary()
 
     def _perform_export(self):
-        format_ext = {"CSV": "csv", "Excel (XLSX)": "xlsx", "JSON": "json"}
-        ext = format_ext.get(self.format_combo.currentText(), "txt")
+        fmt = self.format_combo.currentText()
+        ext = self.FORMATS.get(fmt, "txt")
 
         file_name, _ = QFileDialog.getSaveFileName(self, "Save Export File", self.settings.value("default_export_dir", ""),
             f"*.{ext}", options=QFileDialog.Option.DontUseNativeDialog
@@ -1866,67 +3784,144 @@ class ExportOptionsDialog(QDialog):
         if not file_name.lower().endswith(f".{ext}"):
             file_name += f".{ext}"
 
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            if self.filter_scope == "full":
-                cursor.execute("SELECT date, type, category, amount, note FROM transactions ORDER BY date DESC")
-            else:
-                conds, params = [], []
-                t, c, sd, ed, q = (self.current_filters.get(k) for k in ["type", "category", "start", "end", "note"])
-                if t and t != "All": conds.append("lower(type)=?"); params.append(t.lower())
-                if c and c != "All": conds.append("lower(category)=?"); params.append(c.lower())
-                if sd: conds.append("date>=?"); params.append(sd)
-                if ed: conds.append("date<=?"); params.append(ed)
-                if q: conds.append("note LIKE ?"); params.append(f"%{q}%")
-                where = ("WHERE " + " AND ".join(conds)) if conds else ""
-                cursor.execute(f"SELECT date, type, category, amount, note FROM transactions {where} ORDER BY date DESC", params)
-
-            rows = cursor.fetchall()
-            conn.close()
-            headers = ["Date", "Type", "Category", "Amount", "Note"]
-            fmt = self.format_combo.currentText()
-            if fmt == "CSV": self._export_to_csv(file_name, headers, rows)
-            elif fmt == "Excel (XLSX)": self._export_to_excel(file_name, headers, rows)
-            elif fmt == "JSON": self._export_to_json(file_name, headers, rows)
-            else: QMessageBox.warning(self, "Export Error", f"Unsupported format: {fmt}"); return
-
-            QMessageBox.information(self, "Export Successful", f"Data exported to {file_name}")
-            self.accept()
+        conds, params = ["deleted_at IS NULL"], []
+        if self.filter_scope != "full":
+            t, c, sd, ed, q = (self.current_filters.get(k) for k in ["type", "category", "start", "end", "note"])
+            if t and t != "All": conds.append("type=?"); params.append(canonical_label(t))
+            if c and c != "All":
+                conds.append("category_id IN (SELECT id FROM categories WHERE name = ?)"); params.append(canonical_label(c))
+            if sd: conds.append("date>=?"); params.append(sd)
+            if ed: conds.append("date<=?"); params.append(ed)
+            if q:
+                cond, note_params = notes_condition(self.db, q)
+                conds.append(cond); params.extend(note_params)
+        where = "WHERE " + " AND ".join(conds)
+
+        # The export streams on a worker; the dialog only tracks progress and can cancel it
+        self._set_running(True)
+        self.executor.submit_job("export", self._run_export, fmt, file_name, where, params,
+                                 on_result=self._export_finished, on_error=self._export_failed,
+                                 on_progress=self._export_progress)
+
+    def _set_running(self, running: bool):
+        self.progress_bar.setVisible(running)
+        self.progress_bar.setRange(0, 0)
+        self.export_btn.setEnabled(not running)
+        for widget in (self.full_db_radio, self.filtered_radio, self.filter_group, self.format_combo):
+            widget.setEnabled(not running and (widget is not self.filter_group or self.filter_scope == "filtered"))
+
+    def _export_progress(self, done, total):
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(done)
+
+    def _export_finished(self, result):
+        file_name, count, elapsed = result
+        logger.info(f"Exported {count} transactions to {file_name} in {elapsed:.2f}s")
+        QMessageBox.information(self, "Export Successful", f"Data exported to {file_name}")
+        self.accept()
 
-        except Exception as e:
-            QMessageBox.critical(self, "Export Error", f"An error occurred: {e}")
-            logger.error("Export failed", exc_info=True)
+    def _export_failed(self, e):
+        self._set_running(False)
+        QMessageBox.critical(self, "Export Error", f"An error occurred: {e}")
+        logger.error(f"Export failed: {e}", exc_info=e)
 
-    # Export helpers
-    def _export_to_csv(self, file_name, headers, rows):
-        import csv
+    def reject(self):
+        if self.executor.is_loading("export"):
+            self.executor.cancel("export")
+            self._set_running(False)
+            logger.info("Export cancelled")
+            return
+        super().reject()
+
+    @classmethod
+    def _run_export(cls, db: Database, job, fmt, file_name, where, params):
+        started = time.perf_counter()
+        total = db.fetchone(f"SELECT COUNT(*) FROM transactions {where}", params)[0]
+        job.progress(0, total)
+        writer = {"CSV": cls._export_to_csv, "Excel (XLSX)": cls._export_to_excel,
+                  "JSON": cls._export_to_json, "JSON Lines": cls._export_to_jsonl}.get(fmt)
+        if writer is None:
+            raise ValueError(f"Unsupported format: {fmt}")
+
+        precision = db.amount_precision
+
+        def rows():
+            # Amounts leave the database as exact decimals (Decimal("12.50"), never the
+            # float 12.5), so an export imports back to the same minor units
+            rows = iter_rows(db, f"SELECT date, type, {CATEGORY_NAME}, amount, note FROM transactions {where} "
+                                 "ORDER BY date DESC", params, EXPORT_BATCH_SIZE)
+            for count, (date, type_, category, amount, note) in enumerate(rows, 1):
+                yield date, type_, category, Decimal(format_amount(amount, precision)), note
+                if count % EXPORT_BATCH_SIZE == 0:
+                    if job.cancelled:
+                        raise InterruptedError("Export cancelled")
+                    job.progress(count, total)
+
+        # Write beside the target and swap it in at the end, so a cancelled or failed
+        # run never leaves a truncated file (or removes a newer run's output)
+        part_name = f"{file_name}.{id(job):x}.part"
+        try:
+            writer(part_name, cls.HEADERS, rows())
+            if job.cancelled:
+                raise InterruptedError("Export cancelled")
+            os.replace(part_name, file_name)
+        finally:
+            if os.path.exists(part_name):
+                os.remove(part_name)
+        job.progress(total, total)
+        return file_name, total, time.perf_counter() - started
+
+    # Export helpers - each consumes `rows` lazily so memory stays flat
+    @staticmethod
+    def _export_to_csv(file_name, headers, rows):
         with open(file_name, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(headers)
             writer.writerows(rows)
 
-    def _export_to_excel(self, file_name, headers, rows):
-        import openpyxl
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Transactions"
+    @staticmethod
+    def _export_to_excel(file_name, headers, rows):
+        if load_openpyxl() is None:
+            raise RuntimeError("Excel export requires openpyxl (pip install openpyxl).")
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Transactions")
         ws.append(headers)
         for r in rows: ws.append(r)
         wb.save(file_name)
 
-    def _export_to_json(self, file_name, headers, rows):
-        data = [{headers[i].lower(): val for i, val in enumerate(row)} for row in rows]
+    @staticmethod
+    def _json_value(dumps, value):
+        # Decimals are written as their own text, a JSON number with no float rounding
+        return str(value) if isinstance(value, Decimal) else dumps(value)
+
+    @classmethod
+    def _export_to_json(cls, file_name, headers, rows):
+        # Same layout as json.dump(indent=4), written one object at a time. Values go
+        # through the C encoder; indent= would fall back to the pure-Python one.
+        dumps = json.JSONEncoder(ensure_ascii=False).encode
+        keys = [f'\n        {dumps(h.lower())}: ' for h in headers]
+        with open(file_name, 'w', encoding='utf-8') as f:
+            f.write("[")
+            for i, row in enumerate(rows):
+                fields = ",".join(k + cls._json_value(dumps, v) for k, v in zip(keys, row))
+                f.write(("," if i else "") + "\n    {" + fields + "\n    }")
+            f.write("\n]" if f.tell() > 1 else "]")
+
+    @classmethod
+    def _export_to_jsonl(cls, file_name, headers, rows):
+        # Same layout as json.dumps() of a dict per line
+        dumps = json.JSONEncoder(ensure_ascii=False).encode
+        keys = [f'{dumps(h.lower())}: ' for h in headers]
         with open(file_name, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+            for row in rows:
+                f.write("{" + ", ".join(k + cls._json_value(dumps, v) for k, v in zip(keys, row)) + "}\n")
 
 class ExportFilterDialog(QDialog):
-    def __init__(self, initial_filters: dict, db_path: str, parent=None):
+    def __init__(self, initial_filters: dict, db: Database, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Set Export Filters")
-        self.db_path = db_path
-        self.settings = QSettings("Azralithia", "FinanceTracker")
+        self.db = db
+        self.settings = app_settings()
         self._filters = initial_filters.copy()
 
         self._build_ui()
@@ -1970,22 +3965,8 @@ class ExportFilterDialog(QDialog):
         self.note_search.setText(self._filters.get("note", ""))
 
     def _load_category_filter(self):
-        stored = self.settings.value("categories", None)
-        defaults = {"Income": ["Salary", "Gift", "Bonus", "Other"], "Expense": ["Food", "Rent", "Utilities", "Transport", "Misc"]}
-        try: cats_map = json.loads(stored) if stored else defaults
-        except Exception: cats_map = defaults
-
         t = self.type_filter.currentText()
-        items = []
-        if t == "All":
-            seen = set()
-            for lst in cats_map.values():
-                for c in lst:
-                    if c and c.lower() not in seen:
-                        seen.add(c.lower())
-                        items.append(c.title())
-        else:
-            items = [c.title() for c in cats_map.get(t, [])]
+        items = category_names(self.db, None if t == "All" else t)
 
         self.category_filter.blockSignals(True)
         current = self.category_filter.currentText()
@@ -2012,9 +3993,10 @@ class ExportFilterDialog(QDialog):
         return self._filters
 
 class ImportOptionsDialog(QDialog):
-    def __init__(self, db_path, parent=None):
+    def __init__(self, db: Database, parent=None, executor=None):
         super().__init__(parent)
-        self.db_path = db_path
+        self.db = db
+        self.executor = executor or QueryExecutor(db, self)
         self.setWindowTitle("Import Transactions")
         self.resize(500, 250)
         self._build_ui()
@@ -2033,13 +4015,13 @@ class ImportOptionsDialog(QDialog):
         layout.addLayout(file_layout)
 
         # Import mode
-        mode_group = QGroupBox("Import Mode")
-        mode_layout = QVBoxLayout(mode_group)
+        self.mode_group = QGroupBox("Import Mode")
+        mode_layout = QVBoxLayout(self.mode_group)
         self.override_radio = QRadioButton("Override Existing Database (Replace all data)")
         self.add_radio = QRadioButton("Add to Database (Merge)")
         mode_layout.addWidget(self.override_radio)
         mode_layout.addWidget(self.add_radio)
-        layout.addWidget(mode_group)
+        layout.addWidget(self.mode_group)
 
         # Add mode options
         self.add_options_group = QGroupBox("Add Mode Options")
@@ -2050,13 +4032,23 @@ class ImportOptionsDialog(QDialog):
         add_options_layout.addWidget(self.add_missing_radio)
         layout.addWidget(self.add_options_group)
 
+        self.dedup_file_check = QCheckBox("Skip rows repeated within the import file")
+        layout.addWidget(self.dedup_file_check)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.hide()
+        layout.addWidget(self.progress_bar)
+
         # Buttons
         buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        self.import_btn = buttons.button(QDialogButtonBox.StandardButton.Ok)
+        self.import_btn.setText("Import")
         layout.addWidget(buttons)
 
         # Connections
         self.browse_btn.clicked.connect(self._browse_file)
         self.override_radio.toggled.connect(self._update_add_options_enabled)
+        self.add_missing_radio.toggled.connect(self._update_add_options_enabled)
         buttons.accepted.connect(self._import)
         buttons.rejected.connect(self.reject)
 
@@ -2067,7 +4059,7 @@ class ImportOptionsDialog(QDialog):
 
     def _browse_file(self):
         file_name, _ = QFileDialog.getOpenFileName(self, "Select Import File", "",
-                                                   "CSV Files (*.csv);;Excel Files (*.xlsx);;JSON Files (*.json)",
+                                                   "CSV Files (*.csv);;Excel Files (*.xlsx);;JSON Files (*.json);;JSON Lines (*.jsonl)",
                                                    options=QFileDialog.Option.DontUseNativeDialog) 
         if file_name:
             self.file_line_edit.setText(file_name)
@@ -2075,6 +4067,8 @@ class ImportOptionsDialog(QDialog):
     def _update_add_options_enabled(self):
         enabled = self.add_radio.isChecked() 
         self.add_options_group.setEnabled(enabled)
+        # Skipping duplicates already covers rows repeated within the file
+        self.dedup_file_check.setEnabled(not (enabled and self.add_missing_radio.isChecked()))
 
     def _import(self):
         file_path = self.file_line_edit.text()
@@ -2082,93 +4076,250 @@ class ImportOptionsDialog(QDialog):
             QMessageBox.warning(self, "No File Selected", "Please select a file to import.")
             return
 
-        try:
-            transactions = self._load_transactions_from_file(file_path)
-        except Exception as e:
-            QMessageBox.critical(self, "Import Error", f"Failed to load transactions: {e}")
-            return
+        if self.override_radio.isChecked():
+            mode = "override"
+        else:
+            mode = "add_all" if self.add_all_radio.isChecked() else "add_missing"
+
+        # The file is parsed and written on a worker in one transaction; cancelling rolls it all back
+        self._set_running(True)
+        self.executor.submit_job("import", self._run_import, file_path, mode, self.dedup_file_check.isChecked(),
+                                 on_result=self._import_finished, on_error=self._import_failed,
+                                 on_progress=self._import_progress)
+
+    def _set_running(self, running: bool):
+        self.progress_bar.setVisible(running)
+        self.progress_bar.setRange(0, 0)
+        self.import_btn.setEnabled(not running)
+        self.browse_btn.setEnabled(not running)
+        self.mode_group.setEnabled(not running)
+        if running:
+            self.add_options_group.setEnabled(False)
+            self.dedup_file_check.setEnabled(False)
+        else:
+            self._update_add_options_enabled()
+
+    def _import_progress(self, done, total):
+        self.progress_bar.setRange(0, total)  # total 0 = writing, shown as busy
+        self.progress_bar.setValue(done)
+
+    def _import_finished(self, result):
+        read, added, elapsed = result["read"], result["added"], result["elapsed"]
+        rate = read / elapsed if elapsed > 0 else read
+        logger.info(f"Imported {added} of {read} rows ({result['mode']}) in {elapsed:.2f}s ({rate:,.0f} rows/s); "
+                    f"skipped {result['skipped_existing']} existing and {result['skipped_in_file']} repeated "
+                    f"rows, duplicate checks took {result['dedup_elapsed']:.2f}s")
+        if result["mode"] == "override":
+            message = f"Database overridden with {added} transactions."
+        elif result["mode"] == "add_all":
+            message = f"Added {added} transactions (duplicates allowed)."
+        else:
+            message = f"Added {added} new transactions; skipped {result['skipped_existing']} already in the database."
+        if result["dedup_in_file"]:
+            message += f"\nSkipped {result['skipped_in_file']} rows repeated within the file."
+        if result["mode"] == "add_missing" or result["dedup_in_file"]:
+            message += f"\nDuplicate checks took {result['dedup_elapsed']:.2f}s."
+        QMessageBox.information(self, "Import Successful",
+                                f"{message}\n\nRead {read} rows in {elapsed:.2f}s ({rate:,.0f} rows/s).")
+        self.accept()
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _import_failed(self, e):
+        self._set_running(False)
+        QMessageBox.critical(self, "Import Error", f"Failed during import: {e}")
+        logger.error(f"Import failed: {e}", exc_info=e)
 
-        try:
-            if self.override_radio.isChecked():
-                cursor.execute("DELETE FROM transactions")
-                self._insert_transactions(cursor, transactions)
-                conn.commit()
-                QMessageBox.information(self, "Import Successful", f"Database overridden with {len(transactions)} transactions.")
-            else:
-                if self.add_all_radio.isChecked():
-                    self._insert_transactions(cursor, transactions)
-                    conn.commit()
-                    QMessageBox.information(self, "Import Successful", f"Added {len(transactions)} transactions (duplicates allowed).")
+    def reject(self):
+        if self.executor.is_loading("import"):
+            self.executor.cancel("import")
+            self._set_running(False)
+            logger.info("Import cancelled; no rows were written")
+            return
+        super().reject()
+
+    @classmethod
+    def _run_import(cls, db: Database, job, file_path, mode, dedup_in_file=False):
+        started = time.perf_counter()
+        result = {"mode": mode, "dedup_in_file": dedup_in_file, "read": 0, "added": 0,
+                  "skipped_existing": 0, "skipped_in_file": 0, "dedup_elapsed": 0.0}
+        with cls._open_rows(file_path, db.amount_precision) as (rows, position):
+            notes_indexed = has_notes_index(db)
+            suspended = ROLLUP_TRIGGERS + CATEGORY_USAGE_TRIGGERS + (NOTES_FTS_TRIGGERS if notes_indexed else ())
+            with db.bulk_load(), triggers_suspended(db, suspended):
+                # Stage into an unindexed temp table, then copy across in date order so
+                # the transactions indexes are appended to rather than split at random
+                db.execute("DROP TABLE IF EXISTS temp.import_staging")
+                db.execute("""
+                    CREATE TEMP TABLE import_staging (
+                        date DATETIME, type TEXT, category TEXT, amount INTEGER, note TEXT, content_hash BLOB
+                    )
+                """)
+                while batch := list(itertools.islice(rows, IMPORT_BATCH_SIZE)):
+                    if job.cancelled:
+                        raise InterruptedError("Import cancelled")
+                    db.executemany("INSERT INTO temp.import_staging VALUES "
+                                   "(?1, ?2, ?3, ?4, ?5, content_hash(?1, ?2, ?3, ?4, ?5))", batch)
+                    result["read"] += len(batch)
+                    job.progress(*position())
+                job.progress(0, 0)
+
+                # "Skip duplicates" has always covered repeats within the file as well
+                dedup_in_file = result["dedup_in_file"] = dedup_in_file or mode == "add_missing"
+                dedup_started = time.perf_counter()
+                if dedup_in_file:
+                    db.execute("CREATE INDEX temp.import_staging_hash ON import_staging (content_hash)")
+                    result["skipped_in_file"] = db.execute("""
+                        DELETE FROM temp.import_staging WHERE rowid NOT IN (
+                            SELECT MIN(rowid) FROM temp.import_staging GROUP BY content_hash
+                        )
+                    """).rowcount
+                if mode == "add_missing":
+                    result["skipped_existing"] = db.execute("""
+                        DELETE FROM temp.import_staging AS s WHERE EXISTS (
+                            SELECT 1 FROM transactions AS t WHERE t.content_hash = s.content_hash AND t.deleted_at IS NULL
+                        )
+                    """).rowcount
+                result["dedup_elapsed"] = time.perf_counter() - dedup_started
+
+                if mode == "override":
+                    # Replacing everything is not undoable; the history before it goes too
+                    db.execute("DELETE FROM transactions")
+                    db.execute("DELETE FROM journal")
+                    batch_id = None
                 else:
-                    added_count = 0
-                    for t in transactions:
-                        if not self._transaction_exists(cursor, t):
-                            self._insert_transaction(cursor, t)
-                            added_count += 1
-                    conn.commit()
-                    QMessageBox.information(self, "Import Successful", f"Added {added_count} new transactions (duplicates skipped).")
-        except Exception as e:
-            QMessageBox.critical(self, "Import Error", f"Failed during import: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
-
-        self.accept()
-
-    def _load_transactions_from_file(self, file_path):
+                    batch_id = journal_batch(db, f"Import {os.path.basename(file_path)}")
+                first_id = db.fetchone("SELECT COALESCE(MAX(id), 0) FROM transactions")[0]
+                db.execute("""
+                    INSERT INTO categories (type, name)
+                    SELECT DISTINCT type, category FROM temp.import_staging WHERE category <> ''
+                    ON CONFLICT (type, name) DO NOTHING
+                """)
+                result["added"] = db.execute("""
+                    INSERT INTO transactions (date, type, category_id, amount, note, content_hash, batch_id)
+                    SELECT s.date, s.type, c.id, s.amount, s.note, s.content_hash, ?
+                    FROM temp.import_staging AS s
+                    LEFT JOIN categories AS c ON c.type = s.type AND c.name = s.category
+                    ORDER BY s.date, s.rowid
+                """, (batch_id,)).rowcount
+                db.execute("DROP TABLE temp.import_staging")
+                if batch_id and not result["added"]:
+                    db.execute("DELETE FROM journal WHERE id = ?", (batch_id,))
+                if mode == "override":
+                    rebuild_daily_totals(db)
+                    refresh_category_usage(db)
+                    if notes_indexed:
+                        rebuild_notes_index(db)
+                else:
+                    refresh_rollups_since(db, first_id)
+                    refresh_category_usage(db, first_id)
+                    if notes_indexed:
+                        refresh_notes_index_since(db, first_id)
+                # interrupt() only lands while a statement is running; a cancel that
+                # arrived between statements must still roll the whole import back
+                if job.cancelled:
+                    raise InterruptedError("Import cancelled")
+        result["elapsed"] = time.perf_counter() - started
+        return result
+
+    # Readers - each yields ready-to-insert (date, type, category, amount, note) tuples,
+    # amounts in minor units, and reports (done, total) through `position`: KiB for
+    # text files, rows for workbooks. JSON numbers are read as Decimal, not float.
+    @classmethod
+    @contextmanager
+    def _open_rows(cls, file_path, precision=AMOUNT_PRECISION):
         ext = os.path.splitext(file_path)[1].lower().replace(".", "")
-        transactions = []
-        if ext == "csv":
-            with open(file_path, newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    transactions.append(self._row_to_transaction(row))
-        elif ext == "xlsx":
-            wb = openpyxl.load_workbook(file_path)
-            sheet = wb.active
-            headers = [cell.value for cell in next(sheet.iter_rows(min_row=1, max_row=1))]
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                row_dict = dict(zip(headers, row))
-                transactions.append(self._row_to_transaction(row_dict))
-        elif ext == "json":
-            with open(file_path, encoding='utf-8') as f:
-                data = json.load(f)
-                for item in data:
-                    transactions.append(self._row_to_transaction(item))
-        else:
+        if ext == "xlsx":
+            if load_openpyxl() is None:
+                raise RuntimeError("Excel import requires openpyxl (pip install openpyxl).")
+            wb = openpyxl.load_workbook(file_path, read_only=True)
+            try:
+                sheet = wb.active
+                values = sheet.iter_rows(values_only=True)
+                read = [0]
+
+                def counted():
+                    for row in values:
+                        read[0] += 1
+                        yield row
+                yield cls._table_rows(counted(), precision), lambda: (read[0], max((sheet.max_row or 1) - 1, 1))
+            finally:
+                wb.close()
+            return
+        if ext not in ("csv", "json", "jsonl"):
             raise RuntimeError("Unsupported file format.")
-        return transactions
+        with open(file_path, newline='', encoding='utf-8-sig') as f:
+            size_kib = max(os.fstat(f.fileno()).st_size // 1024, 1)
+            position = lambda: (min(f.buffer.tell() // 1024, size_kib), size_kib)
+            if ext == "csv":
+                rows = cls._table_rows(csv.reader(f), precision)
+            elif ext == "jsonl":
+                rows = (cls._transaction_params(cls._row_to_transaction(json.loads(line, parse_float=Decimal)), precision)
+                        for line in f if line.strip())
+            else:
+                rows = (cls._transaction_params(cls._row_to_transaction(item), precision)
+                        for item in cls._iter_json_array(f))
+            yield rows, position
+
+    @classmethod
+    def _table_rows(cls, rows, precision):
+        # Header-mapped tuples for CSV and workbook rows; skips the per-row dict
+        headers = [str(h).strip().lower() if h is not None else "" for h in next(rows, ())]
+        missing = [name for name in ("date", "type") if name not in headers]
+        if missing:
+            raise ValueError(f"Missing column(s): {', '.join(missing).title()}")
+        date, type_ = headers.index("date"), headers.index("type")
+        category, amount, note = (headers.index(name) if name in headers else None
+                                  for name in ("category", "amount", "note"))
+        for row in rows:
+            if not row or not any(row):
+                continue
+            # Missing trailing cells read as None, as csv.DictReader did
+            cell = lambda i: row[i] if i is not None and i < len(row) else None
+            yield (
+                cell(date),
+                canonical_label(cell(type_)),
+                canonical_label(cell(category)),
+                to_minor_units(cell(amount) or 0, precision),
+                cell(note) or "",
+            )
+
+    @staticmethod
+    def _iter_json_array(f, chunk_size=1 << 16):
+        # Decodes a top-level array one element at a time, so only the current
+        # chunk and element are ever held in memory
+        decoder = json.JSONDecoder(parse_float=Decimal)
+        separators = re.compile(r"[\s,]*")
+        buf = f.read(chunk_size).lstrip()
+        if not buf.startswith("["):
+            raise ValueError("Expected a JSON array of transactions.")
+        pos = 1
+        while True:
+            pos = separators.match(buf, pos).end()
+            if buf.startswith("]", pos):
+                return
+            try:
+                item, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            yield item
 
-    def _row_to_transaction(self, row):
+    @staticmethod
+    def _row_to_transaction(row):
         return {
             "date": row.get("Date") or row.get("date"),
             "type": row.get("Type") or row.get("type"),
             "category": row.get("Category") or row.get("category"),
-            "amount": float(row.get("Amount") or row.get("amount") or 0),
+            "amount": row.get("Amount") or row.get("amount") or 0,
             "note": row.get("Note") or row.get("note") or ""
         }
 
-    def _transaction_exists(self, cursor, t):
-        cursor.execute("""
-            SELECT 1 FROM transactions WHERE
-            date = ? AND
-            lower(type) = ? AND
-            lower(category) = ? AND
-            amount = ? AND
-            note = ?
-            LIMIT 1
-        """, (t["date"], t["type"].lower(), t["category"].lower(), t["amount"], t["note"]))
-        return cursor.fetchone() is not None
-
-    def _insert_transactions(self, cursor, transactions):
-        for t in transactions:
-            cursor.execute("""
-                INSERT INTO transactions (date, type, category, amount, note)
-                VALUES (?, ?, ?, ?, ?)
-            """, (t["date"], t["type"], t["category"], t["amount"], t["note"]))
+    @staticmethod
+    def _transaction_params(t, precision):
+        return (t["date"], canonical_label(t["type"]), canonical_label(t["category"]),
+                to_minor_units(t["amount"], precision), t["note"])
 
 class CategoryEditor(QDialog):
     def __init__(self, categories, parent=None):
@@ -2458,14 +4609,18 @@ class Sidebar(QWidget):
         self.theme_toggled.emit(bool(state))
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, db_path: str = DB_PATH):
         super().__init__()
         self.pending_delete_transactions = {}
+        self._purge_error_reported = False
         self.delete_countdown_timer = QTimer(self) 
         self.delete_countdown_timer.timeout.connect(self._update_delete_countdowns) 
         self.delete_countdown_timer.start(1000)
         self.setWindowIcon(QIcon(resource_path("assets/icon.png")))
-        create_db()
+        with startup_phase("open database + migrations"):
+            self.db = Database(db_path)
+            create_db(self.db)
+        QTimer.singleShot(0, log_startup_report)
 
         self.setWindowTitle("Azralithia Finance Tracker")
         self.setMinimumSize(1200, 700)
@@ -2478,191 +4633,331 @@ class MainWindow(QMainWindow):
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
 
+        self.settings = app_settings()
+        self.settings.changed.connect(self._setting_changed)
+        self.executor = QueryExecutor(self.db, self)
+        # Every write goes through the bus; it decides which pages actually reload
+        self.bus = InvalidationBus(self)
+
+        # Stack slots are fixed (last_page_index is persisted). Every slot starts as
+        # an empty placeholder and its page is built on first navigation.
         self.stack = QStackedWidget()
-        self.transactions_page = TransactionsPage(main_window=self)
-        self.stack.addWidget(self.transactions_page)
-        self.show_summary_tab = SummaryPage(db_path="transactions.db")
-        self.stack.addWidget(self.show_summary_tab)
-        self.history_page = HistoryPage(db_path="transactions.db", main_window=self) 
-        self.stack.addWidget(self.history_page)
-        self.main_page = MainPage(self)
-        self.main_page.set_page_switcher(self.stack, self.transactions_page)
-        self.settings_page = SettingsPage()
-        self.stack.addWidget(self.main_page)
-        self.stack.addWidget(self.settings_page)
+        self._page_slots = [
+            ("transactions_page", "Manage Transactions", self._build_transactions_page),
+            ("show_summary_tab", "Show Summary", self._build_summary_page),
+            ("history_page", "Transaction Log", self._build_history_page),
+            ("main_page", "Main", self._build_main_page),
+            ("settings_page", "Settings", self._build_settings_page),
+        ]
+        for _ in self._page_slots:
+            self.stack.addWidget(QWidget())
+        self.stack.setCurrentWidget(self.page("main_page"))
         layout.addWidget(self.stack)
-        self.stack.setCurrentWidget(self.main_page)
     
         # Connect sidebar
         self.sidebar.action_triggered.connect(self.handle_action)
         self.sidebar.theme_toggled.connect(self.toggle_theme)
-        self.settings = QSettings("Azralithia", "FinanceTracker")
         light = self.settings.value("light_mode", False, type=bool)
 
         # Sync toggle state with saved setting
         self.sidebar.theme_switch.setChecked(light)
         self.toggle_theme(light)
-        self.transactions_page.data_changed.connect(self.refresh_ui)
-        self.history_page.data_changed.connect(self.refresh_ui)
-        self.transactions_page.data_changed.connect(self.history_page._load_category_filter)
-        self.transactions_page.data_changed.connect(self.history_page.load_page)
-        self.transactions_page.data_changed.connect(self.main_page.load_summary)
-        self.history_page.data_changed.connect(self.main_page.load_summary)
-
-        # Connect setting toggle to QSettings
-        self.settings_page.save_filters_switch.toggled.connect(lambda v: self.settings.setValue("save_filters", bool(v)))
-        self.settings_page.remember_export_filters_switch.toggled.connect(lambda v: self.settings.setValue("remember_export_filters", bool(v)))
-        self.settings_page.date_format_combo.currentTextChanged.connect(lambda v: (self.settings.setValue("date_format", v), self.on_date_format_changed()))
-        self.settings_page.confirm_delete_switch.toggled.connect(lambda v: self.settings.setValue("confirm_delete", bool(v)))
-        self.settings_page.show_undo_on_delete_switch.toggled.connect(lambda v: self.settings.setValue("show_undo_on_delete", bool(v)))
-        self.settings_page.show_undo_confirmation_switch.toggled.connect(lambda v: self.settings.setValue("show_undo_confirmation", bool(v)))
-        self.settings_page.load_last_page_switch.toggled.connect(lambda v: self.settings.setValue("load_last_page", bool(v)))
-        self.settings_page.default_dir_edit.textChanged.connect(lambda v: self.settings.setValue("default_export_dir", v))
-        self.settings_page.logging_level_combo.currentTextChanged.connect(self._update_logging_level_from_settings)
 
         self._load_last_page_viewed()
         self._update_logging_level_from_settings(self.settings.value("logging_level", "INFO")) 
 
+        # Text fields keep their own undo while they have focus
+        QShortcut(QKeySequence.StandardKey.Undo, self, activated=self.undo_last)
+        QShortcut(QKeySequence.StandardKey.Redo, self, activated=self.redo_last)
+
+    # -=- Pages -=-
+    def page(self, name: str) -> QWidget:
+        page = getattr(self, name, None)
+        if page is not None:
+            return page
+        index = next(i for i, slot in enumerate(self._page_slots) if slot[0] == name)
+        with startup_phase(f"build {name}"):
+            page = self._page_slots[index][2]()
+            placeholder = self.stack.widget(index)
+            self.stack.insertWidget(index, page)
+            self.stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+        setattr(self, name, page)
+        if name != "main_page" and hasattr(page, "apply_theme") and hasattr(self, "theme_mode"):
+            page.apply_theme(self.theme_mode)
+        return page
+
+    def _build_main_page(self):
+        page = MainPage(self.db, self, executor=self.executor)
+        page.set_page_switcher(self.handle_action)
+        self.bus.subscribe(page, page.on_data_changed, page.affected_by)
+        return page
+
+    def _build_transactions_page(self):
+        page = TransactionsPage(self.db, main_window=self)
+        self.bus.subscribe(page, page.on_data_changed)
+        page.data_changed.connect(self.bus.notify)
+        return page
+
+    def _build_summary_page(self):
+        page = SummaryPage(self.db, executor=self.executor)
+        self.bus.subscribe(page, page.on_data_changed, page.affected_by)
+        return page
+
+    def _build_history_page(self):
+        page = HistoryPage(self.db, main_window=self, executor=self.executor)
+        self.bus.subscribe(page, page.on_data_changed)
+        page.data_changed.connect(self.bus.notify)
+        return page
+
+    def _build_settings_page(self):
+        page = SettingsPage()
+        # Connect setting toggle to QSettings
+        page.save_filters_switch.toggled.connect(lambda v: self.settings.setValue("save_filters", bool(v)))
+        page.remember_export_filters_switch.toggled.connect(lambda v: self.settings.setValue("remember_export_filters", bool(v)))
+        page.confirm_delete_switch.toggled.connect(lambda v: self.settings.setValue("confirm_delete", bool(v)))
+        page.show_undo_on_delete_switch.toggled.connect(lambda v: self.settings.setValue("show_undo_on_delete", bool(v)))
+        page.show_undo_confirmation_switch.toggled.connect(lambda v: self.settings.setValue("show_undo_confirmation", bool(v)))
+        page.load_last_page_switch.toggled.connect(lambda v: self.settings.setValue("load_last_page", bool(v)))
+        page.default_dir_edit.textChanged.connect(lambda v: self.settings.setValue("default_export_dir", v))
+        page.logging_level_combo.currentTextChanged.connect(self._update_logging_level_from_settings)
+        page.amount_precision_combo.setCurrentIndex(page.amount_precision_combo.findData(self.db.amount_precision))
+        page.amount_precision_combo.currentIndexChanged.connect(self._change_amount_precision)
+        return page
+
+    def _change_amount_precision(self, index: int):
+        combo = self.settings_page.amount_precision_combo
+        precision, current = combo.itemData(index), self.db.amount_precision
+        if precision == current:
+            return
+        if precision < current:
+            reply = QMessageBox.question(
+                self, "Reduce Decimal Places",
+                f"Every amount will be rounded to {precision} decimal place(s). This cannot be undone.\n\nContinue?"
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                combo.blockSignals(True)
+                combo.setCurrentIndex(combo.findData(current))
+                combo.blockSignals(False)
+                return
+        # Rewrites every transaction, so it runs on a worker
+        combo.setEnabled(False)
+        self.executor.submit("settings.precision", set_amount_precision, precision,
+                             on_result=self._amount_precision_changed,
+                             on_error=lambda e: self._amount_precision_failed(e, current))
+
+    def _amount_precision_failed(self, e, previous: int):
+        combo = self.settings_page.amount_precision_combo
+        combo.blockSignals(True)
+        combo.setCurrentIndex(combo.findData(previous))
+        combo.blockSignals(False)
+        combo.setEnabled(True)
+        QMessageBox.critical(self, "Settings Error", f"Failed to change decimal places: {e}")
+        logger.error(f"Changing amount precision failed: {e}", exc_info=e)
+
+    def _amount_precision_changed(self, precision: int):
+        self.db.amount_precision = precision
+        self.settings_page.amount_precision_combo.setEnabled(True)
+        # Rows whose stored amount did not change still need the new number of places
+        if hasattr(self, "history_page"):
+            self.history_page.model.reformat()
+        if hasattr(self, "transactions_page"):
+            self.transactions_page.recent_model.reformat()
+        self.refresh_ui()
+
+    # -=- Undo / Redo -=-
+    def undo_last(self):
+        self._replay_journal(journal_undo, "Undo")
+
+    def redo_last(self):
+        self._replay_journal(journal_redo, "Redo")
+
+    def _replay_journal(self, replay, verb: str):
+        try:
+            done = replay(self.db)
+        except Exception as e:
+            logger.error(f"{verb} failed: {e}", exc_info=True)
+            QMessageBox.critical(self, f"{verb} Error", f"An error occurred: {e}")
+            self.refresh_ui()
+            return
+        if done is None:
+            logger.debug(f"Nothing to {verb.lower()}")
+            return
+        label, changes = done
+        logger.info(f"{verb}: {label}")
+        self._sync_pending_deletes()
+        self.bus.notify(changes)
+
+    def _sync_pending_deletes(self):
+        # A replay can restore a pending deletion or soft-delete rows again; the
+        # countdowns follow whatever is soft-deleted now
+        rows = dict(self.db.fetchall("SELECT id, date FROM transactions WHERE deleted_at IS NOT NULL"))
+        for rid in [rid for rid in self.pending_delete_transactions if rid not in rows]:
+            del self.pending_delete_transactions[rid]
+        deadline = time.monotonic() + UNDO_DELETE_SECONDS
+        for rid, date in rows.items():
+            self.pending_delete_transactions.setdefault(rid, {
+                "transaction": (rid, date),
+                "deadline": deadline,
+                "countdown": UNDO_DELETE_SECONDS
+            })
+        self._refresh_actions()
+
    # -=- Undo Button -=- 
     def undo_delete(self, rid: int):
-        entry = self.pending_delete_transactions.get(rid)
-        if not entry:
+        if rid not in self.pending_delete_transactions:
             QMessageBox.warning(self, "Undo Failed", "No pending deletion found for this transaction.")
             return
+        self.undo_deletes([rid])
 
-        timer = entry.get("timer")
-        if timer:
-            try:
-                timer.stop()
-            except Exception:
-                pass
-
-        labels_map = entry.get("countdown_labels", {})
-        for lbl in list(labels_map.values()):
-            try:
-                if lbl is not None:
-                    lbl.deleteLater()
-            except Exception:
-                pass
-        buttons_map = entry.get("undo_buttons", {})
-        for btn in list(buttons_map.values()):
-            try:
-                if btn is not None:
-                    btn.deleteLater()
-            except Exception:
-                pass
+    def undo_deletes(self, rids) -> int:
+        """Restore every still-pending deletion among `rids` with one statement; returns how many."""
+        entries = {rid: self.pending_delete_transactions.pop(rid) for rid in rids
+                   if rid in self.pending_delete_transactions}
+        if not entries:
+            return 0
 
+        label = "Restore transaction" if len(entries) == 1 else f"Restore {len(entries)} transactions"
         try:
-            del self.pending_delete_transactions[rid]
-        except KeyError:
-            pass
+            with journal_entry(self.db, label, entries):
+                self.db.execute(f"UPDATE transactions SET deleted_at = NULL WHERE id {_SELECTED_IDS}",
+                                (json.dumps(list(entries)),))
+        except Exception as e:
+            logger.error(f"Failed to restore transaction(s) {', '.join(map(str, entries))}: {e}", exc_info=True)
+            QMessageBox.critical(self, "Undo Error", f"An error occurred: {e}")
+            self.refresh_ui()
+            return 0
 
-        logger.info(f"Transaction ID {rid} deletion cancelled.")
-        self.refresh_ui()
+        logger.info(f"Deletion of {len(entries)} transaction(s) cancelled.")
+        self.bus.notify(ChangeSet(updated=entries.keys(), dates=[e["transaction"][1] for e in entries.values()]))
+        self._refresh_actions()
         show_confirmation = self.settings.value("show_undo_confirmation", True, type=bool)
         if show_confirmation:
-            QMessageBox.information(self, "Undo Successful", "Transaction deletion cancelled.")
+            message = ("Transaction deletion cancelled." if len(entries) == 1
+                       else f"Deletion of {len(entries)} transactions cancelled.")
+            QMessageBox.information(self, "Undo Successful", message)
+        return len(entries)
 
     def mark_transaction_for_deletion(self, rid: int, transaction_data: tuple):
+        self.delete_transactions([transaction_data])
+
+    def delete_transactions(self, rows):
+        """Delete the given model rows (id and date first) with one statement; a soft delete while undo is on."""
+        rows = [row for row in rows if row[0] not in self.pending_delete_transactions]
+        if not rows:
+            return
+
         # Confirm delete setting
         if self.settings.value("confirm_delete", True, type=bool):
+            question = ("Are you sure you want to delete this transaction?" if len(rows) == 1
+                        else f"Are you sure you want to delete these {len(rows)} transactions?")
             reply = QMessageBox.question(
                 self,
                 "Confirm Delete",
-                "Are you sure you want to delete this transaction?",
+                question,
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
             )
             if reply != QMessageBox.StandardButton.Yes:
-                return  
+                return
 
+        ids = [row[0] for row in rows]
+        dates = [row[1] for row in rows]
         #  Undo option setting
         show_undo_option = self.settings.value("show_undo_on_delete", True, type=bool)
-        if not show_undo_option:
-            try:
-                conn = sqlite3.connect("transactions.db")
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM transactions WHERE id = ?", (rid,))
-                conn.commit()
-                conn.close()
-                logger.info(f"Transaction ID {rid} deleted immediately (undo disabled).")
-            except Exception as e:
-                logger.error(f"Failed to delete transaction ID {rid}: {e}", exc_info=True)
-                QMessageBox.critical(self, "Delete Error", f"An error occurred: {e}")
-            finally:
-                self.refresh_ui()
+        label = "Delete transaction" if len(ids) == 1 else f"Delete {len(ids)} transactions"
+        try:
+            with journal_entry(self.db, label, ids):
+                if show_undo_option:
+                    # Soft delete: the rows leave every total now and stay listed with their
+                    # undo countdown until finalize_deletes() purges them
+                    self.db.execute("UPDATE transactions SET deleted_at = strftime('%Y-%m-%d %H:%M:%f', 'now') "
+                                    f"WHERE id {_SELECTED_IDS} AND deleted_at IS NULL", (json.dumps(ids),))
+                else:
+                    self.db.execute(f"DELETE FROM transactions WHERE id {_SELECTED_IDS}", (json.dumps(ids),))
+        except Exception as e:
+            logger.error(f"Failed to delete transaction(s) {', '.join(map(str, ids))}: {e}", exc_info=True)
+            QMessageBox.critical(self, "Delete Error", f"An error occurred: {e}")
+            self.refresh_ui()
             return
 
-        if rid in self.pending_delete_transactions:
-            return  
+        if not show_undo_option:
+            logger.info(f"{len(ids)} transaction(s) deleted immediately (undo disabled).")
+            self.bus.notify(ChangeSet(deleted=ids, dates=dates))
+            return
 
-        self.pending_delete_transactions[rid] = {
-            "transaction": transaction_data,
-            "countdown": 5,
-            "undo_button": {},
-            "countdown_label": {}
-        }
-        self.refresh_ui()
+        deadline = time.monotonic() + UNDO_DELETE_SECONDS
+        for row in rows:
+            self.pending_delete_transactions[row[0]] = {
+                "transaction": row,
+                "deadline": deadline,
+                "countdown": UNDO_DELETE_SECONDS
+            }
+        self.bus.notify(ChangeSet(updated=ids, dates=dates))
+        self._refresh_actions()
 
     def _update_delete_countdowns(self):
-        for rid in list(self.pending_delete_transactions.keys()):
-            entry = self.pending_delete_transactions.get(rid)
-            if not entry:
-                continue
-
-            entry["countdown"] = entry.get("countdown", 5) - 1
-
-            labels_map = entry.get("countdown_labels", {})
-            for lbl in list(labels_map.values()):
-                try:
-                    if lbl is not None:
-                        lbl.setText(str(entry["countdown"]))
-                except Exception:
-                    pass
-
-            if entry["countdown"] <= 0:
-                self.finalize_delete(rid)
-
-    def finalize_delete(self, rid: int):
-        entry = self.pending_delete_transactions.get(rid)
-        if entry:
-            timer = entry.get("timer")
-            if timer:
-                try:
-                    timer.stop()
-                except Exception:
-                    pass
-        try:
-            conn = sqlite3.connect("transactions.db")
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM transactions WHERE id = ?", (rid,))
-            conn.commit()
-            conn.close()
-            logger.info(f"Transaction ID {rid} successfully deleted from DB.")
-        except Exception as e:
-            logger.error(f"Failed to delete transaction ID {rid} from DB: {e}", exc_info=True)
+        if not self.pending_delete_transactions:
+            return
+        now = time.monotonic()
+        for entry in self.pending_delete_transactions.values():
+            entry["countdown"] = max(0, math.ceil(entry["deadline"] - now))
+        if any(entry["countdown"] == 0 for entry in self.pending_delete_transactions.values()):
+            self.finalize_deletes()
+
+        # Countdowns are painted by the action delegates; just repaint them
+        self._refresh_actions()
+
+    def _refresh_actions(self):
+        for name in ("history_page", "transactions_page"):
+            if hasattr(self, name):
+                getattr(self, name).refresh_actions()
+
+    def finalize_deletes(self):
+        """Purge every deletion whose undo window has passed, on a worker, with one statement and one refresh."""
+        # An import or a precision change holds the write lock for its whole run; the
+        # purge would only wait behind it, so the rows stay pending until a later tick
+        if any(self.executor.is_loading(key) for key in ("delete.purge", "import", "settings.precision")):
+            return
+        self.executor.submit("delete.purge", purge_deleted, UNDO_DELETE_SECONDS,
+                             on_result=self._deletes_purged, on_error=self._purge_failed)
+
+    def _deletes_purged(self, purged):
+        self._purge_error_reported = False
+        # Rows not purged stay pending, with their Undo control, and are retried on the next tick
+        for rid, _ in purged:
+            self.pending_delete_transactions.pop(rid, None)
+        if purged:
+            ids, dates = zip(*purged)
+            logger.info(f"{len(ids)} transaction(s) successfully deleted from DB.")
+            self.bus.notify(ChangeSet(deleted=ids, dates=dates))
+            self._refresh_actions()
+
+    def _purge_failed(self, e):
+        if isinstance(e, sqlite3.OperationalError):
+            # Usually "database is locked" behind another writer
+            logger.warning(f"Purge of deleted transactions deferred: {e}")
+            return
+        logger.error(f"Failed to purge deleted transactions: {e}", exc_info=e)
+        if not self._purge_error_reported:
+            self._purge_error_reported = True
             QMessageBox.critical(self, "Delete Error", f"An error occurred during final deletion: {e}")
-        finally:
-            if rid in self.pending_delete_transactions:
-                try:
-                    del self.pending_delete_transactions[rid]
-                except KeyError:
-                    pass
-            self.refresh_ui()
 
     # -=- Settings -=-
+    def _setting_changed(self, key, value):
+        if key == "date_format":
+            self.on_date_format_changed()
+
     def on_date_format_changed(self):
-        settings = QSettings("Azralithia", "FinanceTracker")
-        current_display_format = settings.value("date_format", "(YYYY-MM-DD) | Year-Month-Day")
-        display_format = map_display_format(current_display_format)
+        display_format = map_display_format(self.settings.value("date_format", DEFAULT_DATE_FORMAT))
 
         if hasattr(self, "history_page"):
             self.history_page.start_date.setDisplayFormat(display_format)
             self.history_page.end_date.setDisplayFormat(display_format)
-            self.history_page.load_page()
+            self.history_page.model.reformat()
 
         if hasattr(self, "transactions_page"):
             self.transactions_page.date.setDisplayFormat(display_format)
-            self.transactions_page.load_recent_transactions() 
+            self.transactions_page.recent_model.reformat()
         
         if hasattr(self, "show_summary_tab"):
             self.show_summary_tab.start_picker.setDisplayFormat(display_format)
@@ -2674,11 +4969,11 @@ class MainWindow(QMainWindow):
         new_title_suffix = ""
 
         if action_name == "Main":
-            self.stack.setCurrentWidget(self.main_page)
+            self.stack.setCurrentWidget(self.page("main_page"))
             new_title_suffix = ""
 
         elif action_name == "Settings":
-            self.stack.setCurrentWidget(self.settings_page)
+            self.stack.setCurrentWidget(self.page("settings_page"))
             new_title_suffix = " - Settings"
 
         elif action_name == "Exit":
@@ -2686,15 +4981,15 @@ class MainWindow(QMainWindow):
             return 
         
         elif action_name == "Manage Transactions":
-            self.stack.setCurrentWidget(self.transactions_page)
+            self.stack.setCurrentWidget(self.page("transactions_page"))
             new_title_suffix = " - Manage Transactions"
 
         elif action_name == "Show Summary":
-            self.stack.setCurrentWidget(self.show_summary_tab)
+            self.stack.setCurrentWidget(self.page("show_summary_tab"))
             new_title_suffix = " - Summary"
 
         elif action_name == "Transaction Log":
-            self.stack.setCurrentWidget(self.history_page)
+            self.stack.setCurrentWidget(self.page("history_page"))
             new_title_suffix = " - Transaction Log"
 
         elif action_name == "Export":
@@ -2720,24 +5015,17 @@ class MainWindow(QMainWindow):
                 "note": self.history_page.note_search.text()
             }
             self.settings.setValue("history_filters", json.dumps(filters))
+        self.executor.shutdown()
+        # Closing gives up on the undo window; anything left would be purged at next start anyway
+        purge_deleted(self.db)
+        self.db.close()
         super().closeEvent(event)
 
     def _load_last_page_viewed(self):
         if self.settings.value("load_last_page", False, type=bool):
             last_page_index = self.settings.value("last_page_index", 0, type=int)
-            self.stack.setCurrentIndex(last_page_index)
-            page_name_map = {
-                self.stack.indexOf(self.main_page): "Main",
-                self.stack.indexOf(self.transactions_page): "Manage Transactions",
-                self.stack.indexOf(self.show_summary_tab): "Summary",
-                self.stack.indexOf(self.history_page): "Transaction Log",
-                self.stack.indexOf(self.settings_page): "Settings"
-            }
-            current_page_widget = self.stack.currentWidget()
-            for index, name in page_name_map.items():
-                if self.stack.widget(index) == current_page_widget:
-                    self.setWindowTitle(f"Azralithia Finance Tracker - {name}")
-                    break
+            if 0 <= last_page_index < len(self._page_slots):
+                self.handle_action(self._page_slots[last_page_index][1])
     
     def _update_logging_level_from_settings(self, level_str: str):
         level_map = {
@@ -2753,17 +5041,20 @@ class MainWindow(QMainWindow):
 
     # -=- Dialog -=-
     def _open_import_dialog(self):
-        dialog = ImportOptionsDialog(db_path="transactions.db", parent=self)
-        dialog.exec()
+        dialog = ImportOptionsDialog(self.db, parent=self, executor=self.executor)
+        if dialog.exec():
+            # An override import removes pending deletions along with everything else
+            self._sync_pending_deletes()
+            self.refresh_ui()
 
     def _open_export_dialog(self):
-        dialog = ExportOptionsDialog(db_path="transactions.db", parent=self)
+        dialog = ExportOptionsDialog(self.db, parent=self, executor=self.executor)
         dialog.exec()
 
     # -=- Theme settings -=-
     def toggle_theme(self, light_mode: bool):
         self.settings.setValue("light_mode", bool(light_mode)) 
-        theme_mode = "light" if light_mode else "dark"
+        theme_mode = self.theme_mode = "light" if light_mode else "dark"
         
         # Main Stylesheet
         if light_mode:
@@ -2789,15 +5080,88 @@ class MainWindow(QMainWindow):
         self.sidebar.theme_switch.update()
 
     def refresh_ui(self):
-        self.main_page.load_summary()
-        self.show_summary_tab.refresh_summary()
-        self.history_page.load_page()
-        self.transactions_page.load_recent_transactions()
-
+        self.bus.notify(ChangeSet(full=True))
+
+
+def benchmark_startup(app: QApplication, rows: int = 200_000) -> dict:
+    """Time MainWindow to first paint (and to its first summary) against a generated fixture database.
+
+    Settings come from a throwaway ini file, so the user's own settings are neither read nor changed."""
+    import random
+    import shutil
+    import tempfile
+    settings_dir = tempfile.mkdtemp(prefix="finance_tracker_bench_")
+    app_settings(QSettings(os.path.join(settings_dir, "settings.ini"), QSettings.Format.IniFormat))
+    path = os.path.join(tempfile.gettempdir(), f"finance_tracker_bench_{rows}.db")
+    if not os.path.exists(path):
+        rng = random.Random(0)
+        categories = {"income": ["salary", "gift", "interest"], "expense": ["food", "rent", "transport", "fun"]}
+        today = QDate.currentDate()
+        db = Database(path)
+        create_db(db)
+        for type_, names in categories.items():
+            save_category_list(db, type_, names)
+        with db.transaction():
+            db.executemany(
+                "INSERT INTO transactions (type, amount, category_id, date, note, content_hash) "
+                "VALUES (?1, ?2, (SELECT id FROM categories WHERE type = ?1 AND name = ?3), ?4, ?5, "
+                "content_hash(?4, ?1, ?3, ?2, ?5))",
+                ((t, rng.randrange(100, 50_000), rng.choice(categories[t]),
+                  today.addDays(-rng.randrange(3650)).toString("yyyy-MM-dd"), f"fixture {i}")
+                 for i, t in enumerate(rng.choice(("income", "expense")) for _ in range(rows))))
+        db.close()
+        logger.info(f"Generated benchmark fixture {path} with {rows} transactions")
+
+    marks = {}
+    started = time.perf_counter()
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint:
+                marks.setdefault("first paint", time.perf_counter() - started)
+            return False
+
+    first_paint = FirstPaint()
+    app.installEventFilter(first_paint)
+    window = MainWindow(path)
+    marks["window constructed"] = time.perf_counter() - started
+    window.show()
+    while "first paint" not in marks or window.executor.is_loading("main.summary"):
+        app.processEvents()
+    marks["main summary loaded"] = time.perf_counter() - started
+    app.removeEventFilter(first_paint)
+    window.close()
+    shutil.rmtree(settings_dir, ignore_errors=True)
+    for name, seconds in marks.items():
+        logger.info(f"Startup benchmark ({rows} rows): {name} after {seconds * 1000:.1f} ms")
+    return marks
 
 if __name__ == "__main__":
+    if "--rebuild-totals" in sys.argv:
+        db = Database(DB_PATH)
+        create_db(db)
+        started = time.perf_counter()
+        rows = rebuild_daily_totals(db)
+        logger.info(f"Rebuilt daily_totals: {rows} rows in {(time.perf_counter() - started) * 1000:.1f} ms")
+        db.close()
+        sys.exit(0)
+    if "--verify-hashes" in sys.argv:
+        db = Database(DB_PATH)
+        create_db(db)
+        mismatched = find_hash_mismatches(db)
+        if mismatched:
+            logger.error(f"{len(mismatched)} transaction(s) with a stale content_hash, e.g. ids {mismatched[:10]}")
+        else:
+            logger.info("All content hashes match their transactions")
+        db.close()
+        sys.exit(1 if mismatched else 0)
     app = QApplication(sys.argv)
     app.setStyle("Fusion")  
+    if "--benchmark-startup" in sys.argv:
+        # Optional row count: --benchmark-startup [rows]
+        i = sys.argv.index("--benchmark-startup") + 1
+        benchmark_startup(app, int(sys.argv[i]) if i < len(sys.argv) and sys.argv[i].isdigit() else 200_000)
+        sys.exit(0)
     window = MainWindow()
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,44 @@
+import types
+
+import pytest
+
+from finance_tracker_gui import (Database, ExportOptionsDialog, ImportOptionsDialog, create_db,
+                                 format_amount, set_amount_precision)
+
+FORMATS = {"CSV": "csv", "Excel (XLSX)": "xlsx", "JSON": "json", "JSON Lines": "jsonl"}
+
+
+def open_db(path, precision):
+    db = Database(str(path))
+    create_db(db)
+    db.amount_precision = set_amount_precision(db, precision)
+    return db
+
+
+@pytest.mark.parametrize("precision", range(5))
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_export_import_round_trips_exact_amounts(tmp_path, fmt, precision):
+    if fmt == "Excel (XLSX)":
+        pytest.importorskip("openpyxl")
+    job = types.SimpleNamespace(cancelled=False, progress=lambda done, total: None)
+    source = open_db(tmp_path / "source.db", precision)
+    amounts = [1, 7, 10 ** precision * 5, 10 ** precision + 1, 123_456_789, 99_999_999_999]
+    source.executemany("INSERT INTO transactions (date, type, amount, note) VALUES ('2024-03-01', 'expense', ?, ?)",
+                       [(amount, f"row {i}") for i, amount in enumerate(amounts)])
+    source.conn.commit()
+
+    path = str(tmp_path / f"export.{FORMATS[fmt]}")
+    ExportOptionsDialog._run_export(source, job, fmt, path, "WHERE deleted_at IS NULL", [])
+    if fmt != "Excel (XLSX)":
+        # Written as exact decimal text ("500.00"), not a float ("500.0")
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        for amount in amounts:
+            assert format_amount(amount, precision) in text
+    target = open_db(tmp_path / "target.db", precision)
+    ImportOptionsDialog._run_import(target, job, path, "add_all")
+
+    query = "SELECT note, amount FROM transactions ORDER BY note"
+    assert target.fetchall(query) == source.fetchall(query)
+    source.close()
+    target.close()
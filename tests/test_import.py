@@ -0,0 +1,53 @@
+import types
+
+import pytest
+
+from finance_tracker_gui import ROLLUP_TRIGGERS, Database, ImportOptionsDialog, create_db
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "transactions.db"))
+    create_db(db)
+    yield db
+    db.close()
+
+
+def write_csv(tmp_path, *rows):
+    path = tmp_path / "import.csv"
+    path.write_text("\n".join(("Date,Type,Category,Amount,Note",) + rows) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_csv_row_shorter_than_header_imports(db, tmp_path):
+    path = write_csv(tmp_path, "2024-02-01,Expense,Food,12.50,Lunch", "2024-02-02,Income,Salary,1000")
+    job = types.SimpleNamespace(cancelled=False, progress=lambda done, total: None)
+
+    result = ImportOptionsDialog._run_import(db, job, path, "add_all")
+
+    assert result["added"] == 2
+    rows = db.fetchall("SELECT date, type, amount, note FROM transactions ORDER BY date")
+    assert [tuple(r) for r in rows] == [
+        ("2024-02-01", "expense", 1250, "Lunch"),
+        ("2024-02-02", "income", 100000, ""),
+    ]
+
+
+def test_cancel_after_staging_rolls_back(db, tmp_path):
+    path = write_csv(tmp_path, "2024-02-01,Expense,Food,12.50,Lunch")
+    job = types.SimpleNamespace(cancelled=False)
+
+    def progress(done, total):
+        # (0, 0) marks the end of staging; cancel between the remaining statements
+        if (done, total) == (0, 0):
+            job.cancelled = True
+    job.progress = progress
+
+    with pytest.raises(InterruptedError):
+        ImportOptionsDialog._run_import(db, job, path, "add_missing")
+
+    assert db.fetchone("SELECT COUNT(*) FROM transactions")[0] == 0
+    assert db.fetchone("SELECT COUNT(*) FROM journal")[0] == 0
+    assert db.fetchone("SELECT COUNT(*) FROM daily_totals")[0] == 0
+    names = {name for (name,) in db.fetchall("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    assert names >= set(ROLLUP_TRIGGERS)